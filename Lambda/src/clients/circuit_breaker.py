@@ -0,0 +1,152 @@
+import os
+import threading
+import time
+from enum import Enum
+from typing import Any
+
+from requests import HTTPError, RequestException
+
+DEFAULT_FAILURE_THRESHOLD = int(os.getenv("apiCircuitFailureThreshold", "5"))
+DEFAULT_RECOVERY_TIMEOUT = float(os.getenv("apiCircuitRecoveryTimeout", "30"))
+DEFAULT_SLOW_CALL_THRESHOLD = float(os.getenv("apiCircuitSlowCallThreshold", "10"))
+"""calls slower than this many seconds count as failures, even if they succeed"""
+
+_breakers: dict[str, "CircuitBreaker"] = {}
+_breakers_lock = threading.Lock()
+
+
+class CircuitState(Enum):
+    closed = "closed"
+    open = "open"
+    half_open = "half_open"
+
+
+class CircuitOpenError(RequestException):
+    """Raised instead of sending a request while the circuit is open"""
+
+    def __init__(self, breaker: "CircuitBreaker") -> None:
+        self.breaker = breaker
+        super().__init__(f"circuit is open for {breaker.name}")
+
+
+def is_endpoint_failure(error: RequestException) -> bool:
+    """Whether an error says something about the endpoint's health, rather than about the request"""
+
+    if isinstance(error, HTTPError) and error.response is not None:
+        return error.response.status_code >= 500
+
+    return True
+
+
+class CircuitBreaker:
+    """
+    Tracks the health of an endpoint. After `failure_threshold` consecutive failures the
+    circuit opens and requests fail fast; after `recovery_timeout` seconds a single probe
+    request is let through (half-open), which either closes or re-opens the circuit
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        recovery_timeout: float = DEFAULT_RECOVERY_TIMEOUT,
+        slow_call_threshold: float = DEFAULT_SLOW_CALL_THRESHOLD,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.slow_call_threshold = slow_call_threshold
+
+        self._lock = threading.Lock()
+        self._state = CircuitState.closed
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+        self.consecutive_failures = 0
+        self.latency_avg = 0.0
+        """exponentially-weighted average latency of recent calls"""
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._get_state()
+
+    def _get_state(self) -> CircuitState:
+        if self._state == CircuitState.open and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = CircuitState.half_open
+            self._probe_in_flight = False
+
+        return self._state
+
+    def _open(self) -> None:
+        self._state = CircuitState.open
+        self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            state = self._get_state()
+            if state == CircuitState.closed:
+                return True
+
+            if state == CircuitState.half_open and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+
+            return False
+
+    def release_probe(self) -> None:
+        """Let another request probe a half-open circuit, e.g. when a probe ended without reaching the API"""
+
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _record_latency(self, latency: float) -> None:
+        self.latency_avg = latency if not self.latency_avg else 0.8 * self.latency_avg + 0.2 * latency
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self._record_latency(latency)
+            if latency >= self.slow_call_threshold:
+                self._record_failure()
+                return
+
+            self.consecutive_failures = 0
+            self._state = CircuitState.closed
+            self._probe_in_flight = False
+
+    def record_failure(self, latency: float) -> None:
+        with self._lock:
+            self._record_latency(latency)
+            self._record_failure()
+
+    def _record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self._state == CircuitState.half_open or self.consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def describe(self) -> dict[str, Any]:
+        """Summarize the breaker for logging"""
+
+        with self._lock:
+            return {
+                "name": self.name,
+                "state": self._get_state().value,
+                "consecutive_failures": self.consecutive_failures,
+                "latency_avg": round(self.latency_avg, 3),
+            }
+
+
+def get_circuit_breaker(base_url: str) -> CircuitBreaker:
+    """Get the circuit breaker for a base url, which is shared across invocations in this container"""
+
+    breaker = _breakers.get(base_url)
+    if breaker:
+        return breaker
+
+    with _breakers_lock:
+        breaker = _breakers.get(base_url)
+        if not breaker:
+            breaker = _breakers[base_url] = CircuitBreaker(base_url)
+
+        return breaker
@@ -0,0 +1,139 @@
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional
+
+from requests import ConnectionError, HTTPError, RequestException, Response, Timeout
+
+RETRYABLE_STATUS_CODES = frozenset([429, 500, 502, 503, 504])
+
+
+def parse_retry_after(response: Optional[Response]) -> Optional[float]:
+    """Parse a Retry-After header, which is either a number of seconds or an HTTP date"""
+
+    if response is None:
+        return None
+
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def deadline_from_context(context: Any, margin: float = 1) -> Optional[float]:
+    """
+    Build a deadline (in `time.monotonic` seconds) from a Lambda context, leaving `margin`
+    seconds to finish the invocation. Returns None if there is no Lambda context
+    """
+
+    if context is None or not hasattr(context, "get_remaining_time_in_millis"):
+        return None
+
+    return time.monotonic() + context.get_remaining_time_in_millis() / 1000 - margin
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, honoring Retry-After headers"""
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 10,
+        jitter: bool = True,
+        retry_status_codes: frozenset[int] = RETRYABLE_STATUS_CODES,
+    ) -> None:
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.retry_status_codes = retry_status_codes
+
+    def should_retry(self, attempt: int, error: RequestException) -> bool:
+        if attempt >= self.max_attempts:
+            return False
+
+        if isinstance(error, HTTPError):
+            return error.response is not None and error.response.status_code in self.retry_status_codes
+
+        return isinstance(error, (ConnectionError, Timeout))
+
+    def get_delay(self, attempt: int, response: Optional[Response] = None) -> float:
+        """How long to wait before the next attempt; `attempt` is the attempt which just failed"""
+
+        retry_after = parse_retry_after(response)
+        if retry_after is not None:
+            return retry_after
+
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        return random.uniform(0, delay) if self.jitter else delay
+
+
+class RetryStats:
+    """Per-container request counters, used for logging and to inspect retry behavior in tests"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self.attempts = 0
+            self.retries = 0
+            self.failures = 0
+            self.deadline_exceeded = 0
+            self.latency_total = 0.0
+            self.latency_max = 0.0
+            self.wait_total = 0.0
+
+    def record_attempt(self, latency: float) -> None:
+        with self._lock:
+            self.attempts += 1
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+
+    def record_request(self, failed: bool = False, deadline_exceeded: bool = False) -> None:
+        with self._lock:
+            self.requests += 1
+            self.failures += int(failed)
+            self.deadline_exceeded += int(deadline_exceeded)
+
+    def record_retry(self, delay: float) -> None:
+        with self._lock:
+            self.retries += 1
+            self.wait_total += delay
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "attempts": self.attempts,
+                "retries": self.retries,
+                "failures": self.failures,
+                "deadline_exceeded": self.deadline_exceeded,
+                "latency_total": self.latency_total,
+                "latency_max": self.latency_max,
+                "wait_total": self.wait_total,
+            }
+
+
+retry_stats = RetryStats()
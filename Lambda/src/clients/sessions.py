@@ -0,0 +1,80 @@
+import os
+import socket
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+DEFAULT_POOL_SIZE = int(os.getenv("apiPoolSize", "10"))
+DEFAULT_KEEP_ALIVE = int(os.getenv("apiKeepAlive", "60"))
+"""seconds a pooled connection may sit idle before TCP keep-alive probes are sent; 0 disables keep-alive"""
+
+_sessions: dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTP adapter which enables TCP keep-alive on pooled connections"""
+
+    def __init__(self, keep_alive: int = DEFAULT_KEEP_ALIVE, **kwargs) -> None:
+        self.keep_alive = keep_alive
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        if self.keep_alive > 0:
+            socket_options = list(HTTPConnection.default_socket_options)
+            socket_options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+
+            # not every platform exposes the tuning options
+            if hasattr(socket, "TCP_KEEPIDLE"):
+                socket_options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, self.keep_alive))
+
+            if hasattr(socket, "TCP_KEEPINTVL"):
+                socket_options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, max(1, self.keep_alive // 4)))
+
+            kwargs["socket_options"] = socket_options
+
+        super().init_poolmanager(*args, **kwargs)
+
+
+def get_session(
+    base_url: str, pool_size: int = DEFAULT_POOL_SIZE, keep_alive: int = DEFAULT_KEEP_ALIVE
+) -> requests.Session:
+    """
+    Get the pooled session for a base url, creating it if it doesn't exist yet. Sessions
+    live for the lifetime of the container, so warm invocations reuse open connections.
+
+    Sessions are shared between users, so they must not carry any user-specific state
+    (such as auth headers); pass those per request instead
+    """
+
+    session = _sessions.get(base_url)
+    if session:
+        return session
+
+    with _sessions_lock:
+        session = _sessions.get(base_url)
+        if session:
+            return session
+
+        session = requests.Session()
+        adapter = KeepAliveAdapter(keep_alive=keep_alive, pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({"content-type": "application/json"})
+
+        _sessions[base_url] = session
+        return session
+
+
+def close_sessions(base_url: Optional[str] = None) -> None:
+    """Close and forget pooled sessions, either for a single base url or all of them"""
+
+    with _sessions_lock:
+        base_urls = [base_url] if base_url else list(_sessions)
+        for url in base_urls:
+            session = _sessions.pop(url, None)
+            if session:
+                session.close()
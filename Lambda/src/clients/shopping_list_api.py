@@ -1,10 +1,16 @@
 import time
 from typing import Optional
 
-import requests
-from requests import HTTPError, Response
+from requests import RequestException, Response, Timeout
 
-STATUS_CODES_TO_RETRY = [429, 500]
+from ..utils.metrics import increment, record_timing, timed
+from .circuit_breaker import (
+    CircuitOpenError,
+    get_circuit_breaker,
+    is_endpoint_failure,
+)
+from .retry import RetryPolicy, retry_stats
+from .sessions import DEFAULT_KEEP_ALIVE, DEFAULT_POOL_SIZE, get_session
 
 
 class ShoppingListAPIClient:
@@ -13,10 +19,12 @@ class ShoppingListAPIClient:
     def __init__(
         self,
         base_url: str,
-        auth_token: str,
+        auth_token: Optional[str],
         timeout: int = 30,
-        rate_limit_throttle: int = 5,
-        max_attempts: int = 3,
+        retry_policy: Optional[RetryPolicy] = None,
+        deadline: Optional[float] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        keep_alive: int = DEFAULT_KEEP_ALIVE,
     ) -> None:
         if not base_url:
             raise ValueError("base_url must not be empty")
@@ -28,18 +36,25 @@ class ShoppingListAPIClient:
             base_url = "https://" + base_url
 
         self.base_url = base_url
-        self._client = requests.session()
-        self._client.headers.update(
-            {
-                "content-type": "application/json",
-                "Authorization": f"Bearer {auth_token}",
-            }
-        )
+
+        # the session is pooled and shared across users, so auth is sent per request
+        self._client = get_session(base_url, pool_size=pool_size, keep_alive=keep_alive)
+        self.circuit_breaker = get_circuit_breaker(base_url)
+        self._auth_headers = {"Authorization": f"Bearer {auth_token}"} if auth_token else {}
 
         self.timeout = timeout
-        self.rate_limit_throttle = rate_limit_throttle
-        self.max_attempts = max_attempts
+        self.retry_policy = retry_policy or RetryPolicy()
+
+        self.deadline = deadline
+        """`time.monotonic` time by which every request, including retries, must finish"""
+
+    def _get_remaining_time(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+
+        return self.deadline - time.monotonic()
 
+    @timed("USL.request")
     def _request(
         self,
         method: str,
@@ -47,6 +62,7 @@ class ShoppingListAPIClient:
         headers: Optional[dict] = None,
         params: Optional[dict] = None,
         payload: Optional[dict] = None,
+        data: Optional[bytes] = None,
     ) -> Response:
         if not endpoint or endpoint == "/":
             raise ValueError("endpoint must not be empty")
@@ -55,32 +71,79 @@ class ShoppingListAPIClient:
             endpoint = endpoint[1:]
 
         url = self.base_url + endpoint
+        request_headers = {**self._auth_headers, **(headers or {})}
 
         attempt = 0
         while True:
             attempt += 1
+
+            # never let a request run past the deadline
+            timeout: float = self.timeout
+            remaining_time = self._get_remaining_time()
+            if remaining_time is not None:
+                if remaining_time <= 0:
+                    retry_stats.record_request(failed=True, deadline_exceeded=True)
+                    raise Timeout(f"deadline exceeded before {method.upper()} {url} could be sent")
+
+                timeout = min(timeout, remaining_time)
+
+            # fail fast while the API is known to be unhealthy
+            if not self.circuit_breaker.allow_request():
+                retry_stats.record_request(failed=True)
+                raise CircuitOpenError(self.circuit_breaker)
+
+            start = time.monotonic()
             try:
                 r = self._client.request(
                     method.upper(),
                     url,
-                    headers=headers,
+                    headers=request_headers,
                     params=params,
                     json=payload,
-                    timeout=self.timeout,
+                    data=data,
+                    timeout=timeout,
                 )
+                latency = time.monotonic() - start
+                retry_stats.record_attempt(latency)
+                record_timing("USL.attempt", latency)
                 r.raise_for_status()
+
+                self.circuit_breaker.record_success(latency)
+                retry_stats.record_request()
                 return r
 
-            except HTTPError as e:
-                if attempt >= self.max_attempts:
+            except RequestException as e:
+                latency = time.monotonic() - start
+                if e.response is None:
+                    retry_stats.record_attempt(latency)
+                    record_timing("USL.attempt", latency)
+
+                if is_endpoint_failure(e):
+                    self.circuit_breaker.record_failure(latency)
+
+                else:
+                    # the API responded, so it's healthy even if the request was bad
+                    self.circuit_breaker.record_success(latency)
+
+                if not self.retry_policy.should_retry(attempt, e):
+                    retry_stats.record_request(failed=True)
                     raise
 
-                response: Response = e.response
-                if response.status_code not in STATUS_CODES_TO_RETRY:
+                delay = self.retry_policy.get_delay(attempt, e.response)
+                remaining_time = self._get_remaining_time()
+                if remaining_time is not None and delay >= remaining_time:
+                    retry_stats.record_request(failed=True, deadline_exceeded=True)
                     raise
 
-                time.sleep(self.rate_limit_throttle)
-                continue
+                retry_stats.record_retry(delay)
+                increment("USL.retry")
+                time.sleep(delay)
+
+            except Exception:
+                # the API's health is unknown, but a half-open circuit's probe mustn't stay claimed
+                self.circuit_breaker.release_probe()
+                retry_stats.record_request(failed=True)
+                raise
 
     def get(
         self, endpoint: str, headers: Optional[dict] = None, params: Optional[dict] = None
@@ -107,8 +170,11 @@ class ShoppingListAPIClient:
         payload: Optional[dict] = None,
         headers: Optional[dict] = None,
         params: Optional[dict] = None,
+        data: Optional[bytes] = None,
     ) -> Response:
-        return self._request("POST", endpoint, headers, params, payload)
+        """Post a JSON payload, or a pre-encoded request body via `data`"""
+
+        return self._request("POST", endpoint, headers, params, payload, data)
 
     def put(
         self,
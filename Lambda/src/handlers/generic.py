@@ -1,11 +1,7 @@
-import base64
-import hashlib
-import hmac
 import logging
+from typing import Optional, cast
 
-import requests
 from ask_sdk_core.handler_input import HandlerInput
-from ask_sdk_core.utils import is_intent_name, is_request_type
 from ask_sdk_core.utils.request_util import (
     get_account_linking_access_token,
     get_user_id,
@@ -13,29 +9,18 @@ from ask_sdk_core.utils.request_util import (
 from ask_sdk_model import Response
 from ask_sdk_model.ui import SimpleCard
 
-from ..config import (
-    API_APP_CLIENT_ID,
-    API_APP_CLIENT_SECRET,
-    SHOPPING_LIST_API_LINK_ACCOUNT_ROUTE,
-    SHOPPING_LIST_API_UNLINK_ACCOUNT_ROUTE,
-)
-from ..skill import USL_BASE_URL, sb
-
+from ..clients.retry import deadline_from_context
+from ..interfaces.shopping_list_api import ShoppingListAPIInterface, token_validity
+from ..skill import USL_ACCOUNT_TIMEOUT, USL_BASE_URL, sb
+from ..utils.metrics import end_invocation
+from ..utils.profiling import end_memory_profile
 
-def is_cancel_or_stop_request(input: HandlerInput) -> bool:
-    return any(
-        [
-            is_intent_name("AMAZON.CancelIntent")(input),
-            is_intent_name("AMAZON.StopIntent")(input),
-        ]
-    )
 
-
-@sb.request_handler(can_handle_func=is_request_type("AlexaSkillEvent.SkillAccountLinked"))
+@sb.request_type_handler("AlexaSkillEvent.SkillAccountLinked")
 def account_linked(input: HandlerInput):
     logging.info("Received new account link event; updating user id")
 
-    user_id = get_user_id(input)
+    user_id = cast(Optional[str], get_user_id(input))
     access_token = get_account_linking_access_token(input)
 
     if not user_id:
@@ -46,45 +31,38 @@ def account_linked(input: HandlerInput):
     if not access_token:
         raise ValueError("Missing access token")
 
-    url = USL_BASE_URL + SHOPPING_LIST_API_LINK_ACCOUNT_ROUTE
+    # the user's token may have changed, and a newly linked token shouldn't be treated as rejected
+    token_validity.invalidate_user(user_id)
+    token_validity.invalidate(str(access_token))
 
-    # TODO: wrap this in an interface
-    headers = {"Authorization": f"Bearer {str(access_token)}"}
-    params = {"userId": user_id}
+    usl = ShoppingListAPIInterface(
+        USL_BASE_URL, str(access_token), deadline=deadline_from_context(input.context), timeout=USL_ACCOUNT_TIMEOUT
+    )
 
-    r = requests.post(url, headers=headers, params=params)
-    r.raise_for_status()
+    usl.link_account(user_id)
 
 
-@sb.request_handler(can_handle_func=is_request_type("AlexaSkillEvent.SkillDisabled"))
+@sb.request_type_handler("AlexaSkillEvent.SkillDisabled")
 def skill_disabled(input: HandlerInput):
     logging.info("User has disabled this skill; sending notification to central API")
 
-    user_id = get_user_id(input)
+    user_id = cast(Optional[str], get_user_id(input))
 
     if not user_id:
         raise ValueError("Missing user id")
 
     logging.info(f"user {str(user_id)}")
 
-    url = USL_BASE_URL + SHOPPING_LIST_API_UNLINK_ACCOUNT_ROUTE
-    hmac_signature = hmac.new(
-        key=API_APP_CLIENT_SECRET.encode("utf-8"),
-        msg=API_APP_CLIENT_ID.encode("utf-8"),
-        digestmod=hashlib.sha256,
-    )
-
-    security_hash = base64.b64encode(hmac_signature.digest()).decode()
+    token_validity.invalidate_user(user_id)
 
-    # TODO: wrap this in an interface
-    headers = {"X-Alexa-Security-Hash": security_hash}
-    params = {"userId": user_id}
+    usl = ShoppingListAPIInterface(
+        USL_BASE_URL, deadline=deadline_from_context(input.context), timeout=USL_ACCOUNT_TIMEOUT
+    )
 
-    r = requests.delete(url, headers=headers, params=params)
-    r.raise_for_status()
+    usl.unlink_account(user_id)
 
 
-@sb.request_handler(is_request_type("LaunchRequest"))
+@sb.request_type_handler("LaunchRequest")
 def launch_request_handler(input: HandlerInput) -> Response:
     paragraphs = [
         (
@@ -118,14 +96,14 @@ def launch_request_handler(input: HandlerInput) -> Response:
     return input.response_builder.response
 
 
-@sb.request_handler(is_intent_name("AddToShoppingList"))
+@sb.intent_handler("AddToShoppingList")
 def redirect_shopping_list_request(input: HandlerInput) -> Response:
     speech_text = "To add something to your shopping list, please exit this skill and use your normal Alexa shopping list. Please try again after exiting this skill."
     input.response_builder.speak(speech_text).set_card(SimpleCard("Help", speech_text)).set_should_end_session(True)
     return input.response_builder.response
 
 
-@sb.request_handler(is_intent_name("AMAZON.HelpIntent"))
+@sb.intent_handler("AMAZON.HelpIntent")
 def help_intent_handler(input: HandlerInput) -> Response:
     if get_account_linking_access_token(input):
         speech_text = (
@@ -145,7 +123,7 @@ def help_intent_handler(input: HandlerInput) -> Response:
     return input.response_builder.response
 
 
-@sb.request_handler(is_cancel_or_stop_request)
+@sb.intent_handler("AMAZON.CancelIntent", "AMAZON.StopIntent")
 def cancel_and_stop_intent_handler(input: HandlerInput) -> Response:
     speech_text = ""
 
@@ -158,6 +136,10 @@ def all_exception_handler(input: HandlerInput, ex: Exception) -> Response:
     logging.info("unable to fully process input")
     logging.info(f"{type(ex).__name__}: {ex}")
 
+    # response interceptors are skipped when a handler raises
+    end_invocation(error=True)
+    end_memory_profile(error=True)
+
     speech = "Sorry, I didn't quite catch it. Can you please say it again?"
     input.response_builder.speak(speech).ask(speech)
     return input.response_builder.response
@@ -1,11 +1,14 @@
 import logging
 import time
 from datetime import datetime
-from typing import Union, cast
+from functools import partial
+from typing import Optional, Union, cast
 
 from ask_sdk_core.handler_input import HandlerInput
-from ask_sdk_core.utils import is_request_type
-from ask_sdk_core.utils.request_util import get_account_linking_access_token
+from ask_sdk_core.utils.request_util import (
+    get_account_linking_access_token,
+    get_user_id,
+)
 from ask_sdk_model import Response
 from ask_sdk_model.services.list_management.error import Error
 from ask_sdk_model.services.list_management.list_item_state import ListItemState
@@ -18,61 +21,75 @@ from ask_sdk_model.services.list_management.list_items_deleted_event_request imp
 from ask_sdk_model.services.list_management.list_items_updated_event_request import (
     ListItemsUpdatedEventRequest,
 )
-
-from ..interfaces.list_management import ListManagement
-from ..interfaces.shopping_list_api import ShoppingListAPIInterface
+from ask_sdk_model.services.service_exception import ServiceException
+
+from ..clients.circuit_breaker import CircuitOpenError
+from ..clients.retry import deadline_from_context
+from ..interfaces.dedup import ListEventDeduplicator
+from ..interfaces.list_management import get_list_management, invalidate_cached_list
+from ..interfaces.outbox import ListEventOutbox
+from ..interfaces.shopping_list_api import ShoppingListAPIInterface, token_validity
 from ..models.lists import ReadList
 from ..models.messages import Message, MessageRequest, ObjectType, Operation
-from ..models.shopping_list_api import ShoppingListAPIListEvent
-from ..skill import USL_BASE_URL, sb
+from ..models.shopping_list_api import ShoppingListAPIListEvent, ShoppingListAPIListItem
+from ..skill import (
+    LIST_EVENT_DEDUP_TABLENAME,
+    LIST_EVENT_DEDUP_TTL,
+    LIST_EVENT_HYDRATE_ITEMS,
+    LIST_EVENT_HYDRATE_READ_LIST_MIN_ITEMS,
+    LIST_EVENT_OUTBOX_FALLBACK_ONLY,
+    LIST_EVENT_OUTBOX_KEY_ID,
+    LIST_EVENT_OUTBOX_TABLENAME,
+    USL_BASE_URL,
+    sb,
+)
+from ..utils.metrics import increment, set_operation
 
 # TODO: handle archived and deleted lists (unlink list maps in USL)
 
+list_event_outbox = (
+    ListEventOutbox(LIST_EVENT_OUTBOX_TABLENAME, LIST_EVENT_OUTBOX_KEY_ID) if LIST_EVENT_OUTBOX_TABLENAME else None
+)
+list_event_deduplicator = ListEventDeduplicator(LIST_EVENT_DEDUP_TABLENAME, LIST_EVENT_DEDUP_TTL)
 
-def is_list_item_event(input: HandlerInput) -> bool:
-    return any(
-        [
-            is_request_type("AlexaHouseholdListEvent.ItemsCreated")(input),
-            is_request_type("AlexaHouseholdListEvent.ItemsUpdated")(input),
-            is_request_type("AlexaHouseholdListEvent.ItemsDeleted")(input),
-        ]
-    )
-
-
-@sb.request_handler(can_handle_func=is_list_item_event)
-def handle_list_item_event(input: HandlerInput) -> Response:
-    list_management_client = input.service_client_factory.get_list_management_service()
-    list_management = ListManagement(list_management_client)
-
-    operation: Operation
-    request: Union[ListItemsCreatedEventRequest, ListItemsUpdatedEventRequest, ListItemsDeletedEventRequest]
-    if is_request_type("AlexaHouseholdListEvent.ItemsCreated")(input):
-        operation = Operation.create
-        request = cast(ListItemsCreatedEventRequest, input.request_envelope.request)
 
-    elif is_request_type("AlexaHouseholdListEvent.ItemsUpdated")(input):
-        operation = Operation.update
-        request = cast(ListItemsUpdatedEventRequest, input.request_envelope.request)
+LIST_ITEM_EVENT_OPERATIONS = {
+    "AlexaHouseholdListEvent.ItemsCreated": Operation.create,
+    "AlexaHouseholdListEvent.ItemsUpdated": Operation.update,
+    "AlexaHouseholdListEvent.ItemsDeleted": Operation.delete,
+}
 
-    elif is_request_type("AlexaHouseholdListEvent.ItemsDeleted")(input):
-        operation = Operation.delete
-        request = cast(ListItemsDeletedEventRequest, input.request_envelope.request)
 
-    else:
-        raise Exception("unsupported event; is the request handler configured correctly?")
+def handle_list_item_event(input: HandlerInput, operation: Operation) -> Response:
+    request = cast(
+        Union[ListItemsCreatedEventRequest, ListItemsUpdatedEventRequest, ListItemsDeletedEventRequest],
+        input.request_envelope.request,
+    )
 
     logging.info(f"received list item {operation.value} event {request.request_id}")
+    set_operation(operation.value)
 
-    request = cast(ListItemsCreatedEventRequest, input.request_envelope.request)
     access_token = get_account_linking_access_token(input)
 
     if not request.body or not request.body.list_item_ids:
         raise ValueError("Request body and list item ids should not be null")
 
+    # the list changed outside of this skill, so any cached copy is stale
+    user_id = cast(Optional[str], get_user_id(input))
+    if user_id:
+        invalidate_cached_list(user_id, request.body.list_id)
+
     if not access_token:
         logging.info("User is not linked to USL; aborting")
         return input.response_builder.response
 
+    if user_id:
+        token_validity.track_user(user_id, str(access_token))
+
+    if token_validity.get(str(access_token)) is False:
+        logging.info("USL recently rejected this user's token; aborting")
+        return input.response_builder.response
+
     # send the items to the shopping list API
     list_event = ShoppingListAPIListEvent(
         request_id=request.request_id,
@@ -83,9 +100,6 @@ def handle_list_item_event(input: HandlerInput) -> Response:
         list_item_ids=request.body.list_item_ids,
     )
 
-    shopping_list_api_client = ShoppingListAPIInterface(USL_BASE_URL, str(access_token))
-    shopping_list_api_client.post_list_item_event(list_event)
-
     response = Message(
         source="Alexa",
         event_id=request.request_id,
@@ -97,9 +111,87 @@ def handle_list_item_event(input: HandlerInput) -> Response:
         ],
     )
 
+    # Alexa redelivers events on timeouts and errors, so acknowledge events we've already sent;
+    # events without an id can't be recognized when they're redelivered, so they're always sent
+    request_id = request.request_id
+    if request_id and not list_event_deduplicator.claim(request_id):
+        logging.info(f"list event {request_id} was already processed; skipping. {list_event_deduplicator.stats()}")
+        increment("ListEvent.duplicate")
+        return handle_event_response(input, response)
+
+    try:
+        # deleted items can no longer be read
+        if LIST_EVENT_HYDRATE_ITEMS and operation != Operation.delete and request.body.list_id:
+            item_ids = [str(item_id) for item_id in request.body.list_item_ids]
+            list_event.list_items = hydrate_list_items(input, request.body.list_id, item_ids)
+
+        send_list_event(input, str(access_token), list_event)
+
+    except Exception:
+        if request_id:
+            list_event_deduplicator.release(request_id)
+
+        raise
+
     return handle_event_response(input, response)
 
 
+def hydrate_list_items(
+    input: HandlerInput, list_id: str, item_ids: list[str]
+) -> Optional[list[ShoppingListAPIListItem]]:
+    """Read the items in a list event so USL doesn't have to request them; returns None if they can't be read"""
+
+    client = input.service_client_factory.get_list_management_service()
+    list_management = get_list_management(client, cast(Optional[str], get_user_id(input)))
+
+    try:
+        response = list_management.read_list_items(
+            list_id, item_ids, read_list_min_items=LIST_EVENT_HYDRATE_READ_LIST_MIN_ITEMS
+        )
+
+    except ServiceException as e:
+        response = e.body if isinstance(e.body, Error) else Error(message=str(e))
+
+    except Exception as e:
+        # the items are only a convenience for USL, so they mustn't stop the event from being sent
+        logging.exception(f"unexpected error reading list items for event; sending item ids only: {e}")
+        return None
+
+    if isinstance(response, Error):
+        logging.info(f"unable to read list items for event; sending item ids only: {response.message}")
+        return None
+
+    return [
+        ShoppingListAPIListItem(id=item.id, value=item.value, status=item.status or ListItemState.active)
+        for item in response
+    ]
+
+
+def send_list_event(input: HandlerInput, access_token: str, list_event: ShoppingListAPIListEvent) -> None:
+    if list_event_outbox and not LIST_EVENT_OUTBOX_FALLBACK_ONLY:
+        # acknowledge the event right away; the outbox handler delivers it to USL
+        list_event_outbox.enqueue(access_token, list_event)
+
+    else:
+        try:
+            # events are only coalesced once they've accumulated in the outbox; an invocation has a single event
+            ShoppingListAPIInterface(
+                USL_BASE_URL, access_token, deadline_from_context(input.context)
+            ).post_list_item_event(list_event)
+
+        except CircuitOpenError as e:
+            logging.info(f"Unified Shopping List API is unavailable; circuit breaker: {e.breaker.describe()}")
+            if not list_event_outbox:
+                raise
+
+            list_event_outbox.enqueue(access_token, list_event)
+
+
+# each event type is dispatched straight to the handler along with the operation it represents
+for request_type, operation in LIST_ITEM_EVENT_OPERATIONS.items():
+    sb.add_indexed_handler((request_type, None), partial(handle_list_item_event, operation=operation))
+
+
 def handle_event_response(input: HandlerInput, response: Message) -> Response:
     input.response_builder.set_api_response(response.dict(exclude_none=True))
     return input.response_builder.response
@@ -0,0 +1,129 @@
+import logging
+from typing import Any, Optional
+
+from ..clients.circuit_breaker import CircuitOpenError
+from ..clients.retry import deadline_from_context
+from ..interfaces.outbox import ListEventOutbox
+from ..interfaces.shopping_list_api import (
+    ShoppingListAPIInterface,
+    coalesce_list_events_with_sources,
+)
+from ..models.dynamodb import OutboxEvent
+from ..models.shopping_list_api import ShoppingListAPIListEvent
+from ..skill import (
+    LIST_EVENT_COALESCE_WINDOW,
+    LIST_EVENT_OUTBOX_KEY_ID,
+    LIST_EVENT_OUTBOX_TABLENAME,
+    USL_BASE_URL,
+    USL_POST_ITEM_EVENTS_BATCH_ROUTE,
+)
+
+DRAIN_BATCH_SIZE = 100
+MIN_REMAINING_MILLIS = 15 * 1000
+"""stop draining when the invocation has less time than this left, so a slow batch can't time out"""
+
+
+def _deliver_batch(
+    outbox: ListEventOutbox, shopping_list_api_client: ShoppingListAPIInterface, batch: list[OutboxEvent]
+) -> tuple[int, int]:
+    """
+    Deliver a batch of one user's outbox events, marking each event done or attempted depending on whether the
+    request it was sent in succeeded. Returns how many events were delivered and how many failed. If USL becomes
+    unavailable part way through, what was already delivered is recorded and the CircuitOpenError is raised
+    """
+
+    outbox_events = {outbox_event.request_id: outbox_event for outbox_event in batch}
+    list_events = [ShoppingListAPIListEvent.parse_raw(outbox_event.list_event) for outbox_event in batch]
+    coalesced = coalesce_list_events_with_sources(list_events, LIST_EVENT_COALESCE_WINDOW)
+
+    if USL_POST_ITEM_EVENTS_BATCH_ROUTE:
+        # every event is sent in a single request, so they're delivered together or not at all
+        requests = [
+            (
+                [list_event for list_event, _ in coalesced],
+                [request_id for _, request_ids in coalesced for request_id in request_ids],
+            )
+        ]
+
+    else:
+        requests = [([list_event], request_ids) for list_event, request_ids in coalesced]
+
+    delivered: list[OutboxEvent] = []
+    failed: list[OutboxEvent] = []
+    try:
+        for request_events, request_ids in requests:
+            try:
+                shopping_list_api_client.post_list_item_events(request_events)
+
+            except CircuitOpenError:
+                raise
+
+            except Exception as e:
+                logging.info(f"unable to deliver {len(request_ids)} outbox events; {type(e).__name__}: {e}")
+                failed.extend(outbox_events[request_id] for request_id in request_ids)
+                continue
+
+            delivered.extend(outbox_events[request_id] for request_id in request_ids)
+
+    finally:
+        if delivered:
+            outbox.mark_done(delivered)
+
+        for outbox_event in failed:
+            outbox.mark_attempted(outbox_event)
+
+    return len(delivered), len(failed)
+
+
+def drain_outbox(context: Optional[Any] = None) -> dict[str, int]:
+    """
+    Deliver pending outbox events to the Unified Shopping List API in coalesced batches per user.
+    Events aren't claimed before they're sent, so drains must not overlap; the drain function's
+    reserved concurrency is 1
+    """
+
+    if not LIST_EVENT_OUTBOX_TABLENAME:
+        raise ValueError("the list event outbox is not configured")
+
+    outbox = ListEventOutbox(LIST_EVENT_OUTBOX_TABLENAME, LIST_EVENT_OUTBOX_KEY_ID)
+    pending: dict[str, list[OutboxEvent]] = {}
+    for outbox_event in outbox.get_pending():
+        pending.setdefault(outbox_event.auth_token_hash, []).append(outbox_event)
+
+    delivered = 0
+    failed = 0
+    deadline = deadline_from_context(context, margin=MIN_REMAINING_MILLIS / 1000)
+    for outbox_events in pending.values():
+        outstanding = outbox_events
+        try:
+            # every event in the group has the same token, so only one needs to be decrypted
+            auth_token = outbox.get_auth_token(outbox_events[0])
+            shopping_list_api_client = ShoppingListAPIInterface(USL_BASE_URL, auth_token, deadline)
+            for i in range(0, len(outbox_events), DRAIN_BATCH_SIZE):
+                if context and context.get_remaining_time_in_millis() < MIN_REMAINING_MILLIS:
+                    logging.info("running out of time; leaving remaining events for the next drain")
+                    return {"delivered": delivered, "failed": failed}
+
+                (batch_delivered, batch_failed) = _deliver_batch(
+                    outbox, shopping_list_api_client, outbox_events[i : i + DRAIN_BATCH_SIZE]
+                )
+                delivered += batch_delivered
+                failed += batch_failed
+                outstanding = outbox_events[i + DRAIN_BATCH_SIZE :]
+
+        except CircuitOpenError as e:
+            # USL is known to be down; leave the remaining events untouched without using up their attempts
+            logging.info(f"Unified Shopping List API is unavailable; circuit breaker: {e.breaker.describe()}")
+            return {"delivered": delivered, "failed": failed}
+
+        except Exception as e:
+            # e.g. a token which can't be decrypted or an event which can't be parsed; other users' events
+            # are still delivered
+            logging.exception(f"unable to deliver {len(outstanding)} outbox events for a user: {e}")
+            for outbox_event in outstanding:
+                outbox.mark_attempted(outbox_event)
+
+            failed += len(outstanding)
+
+    logging.info(f"delivered {delivered} outbox events; {failed} failed")
+    return {"delivered": delivered, "failed": failed}
@@ -1,147 +1,254 @@
-import json
 import logging
-from typing import Any, Optional, Union, cast
+from functools import partial
+from typing import Any, Callable, NamedTuple, Optional, cast
 
 from ask_sdk_core.handler_input import HandlerInput
-from ask_sdk_core.utils import is_request_type
+from ask_sdk_core.utils.request_util import get_user_id
 from ask_sdk_model import Response
 from ask_sdk_model.interfaces.messaging.message_received_request import (
     MessageReceivedRequest,
 )
 from ask_sdk_model.services.list_management.error import Error
 from ask_sdk_model.services.service_exception import ServiceException
+from pydantic import BaseModel
 
 from ..config import CALLBACK_EVENT_EXPIRATION, CALLBACK_EVENT_TABLENAME
+from ..interfaces.callback_events import CallbackEventStream
 from ..interfaces.dynamodb import DynamoDB
-from ..interfaces.list_management import ListManagement
+from ..interfaces.list_management import ListManagement, get_list_management
 from ..models.dynamodb import CallbackEvent
 from ..models.lists import (
+    BulkCreateListItems,
+    BulkDeleteListItems,
+    BulkUpdateListItems,
     CreateList,
     CreateListItem,
     DeleteList,
     DeleteListItem,
     ReadList,
+    ReadListDelta,
     ReadListItem,
     UpdateList,
     UpdateListItem,
 )
 from ..models.messages import (
-    Message,
-    MessageResponse,
     MessageResponseBody,
     ObjectType,
     Operation,
+    ReceivedMessage,
 )
-from ..skill import sb
+from ..skill import MESSAGE_CONCURRENCY, sb
+from ..utils.concurrency import execute_ordered
+from ..utils.metrics import METRICS_ENABLED, set_operation, span, timed
 
 event_db = DynamoDB(CALLBACK_EVENT_TABLENAME)
 
 
-@sb.request_handler(can_handle_func=is_request_type("Messaging.MessageReceived"))
-def route_message(input: HandlerInput) -> Response:
-    client = input.service_client_factory.get_list_management_service()
-    list_management = ListManagement(client)
+class RequestRoute(NamedTuple):
+    method: str
+    """the ListManagement method which handles the request"""
 
-    request = cast(
-        MessageReceivedRequest,
-        input.request_envelope.request,
-    )
+    model: Optional[type[BaseModel]]
+    """the model the request's object data is parsed into, if the method takes any"""
 
-    message_data = request.message
-    if not message_data:
-        return input.response_builder.response
 
-    msg = Message.parse_obj(message_data)
-    logging.info(f"received message {msg.event_id}")
+REQUEST_ROUTES: dict[tuple[Operation, ObjectType], RequestRoute] = {
+    (Operation.read_all, ObjectType.list): RequestRoute("read_all_lists", None),
+    (Operation.read, ObjectType.list): RequestRoute("read_list", ReadList),
+    (Operation.read_delta, ObjectType.list): RequestRoute("read_list_delta", ReadListDelta),
+    (Operation.create, ObjectType.list): RequestRoute("create_list", CreateList),
+    (Operation.update, ObjectType.list): RequestRoute("update_list", UpdateList),
+    (Operation.delete, ObjectType.list): RequestRoute("delete_list", DeleteList),
+    (Operation.read, ObjectType.list_item): RequestRoute("read_list_item", ReadListItem),
+    (Operation.create, ObjectType.list_item): RequestRoute("create_list_item", CreateListItem),
+    (Operation.update, ObjectType.list_item): RequestRoute("update_list_item", UpdateListItem),
+    (Operation.delete, ObjectType.list_item): RequestRoute("delete_list_item", DeleteListItem),
+    (Operation.bulk_create, ObjectType.list_item): RequestRoute("bulk_create_list_items", BulkCreateListItems),
+    (Operation.bulk_update, ObjectType.list_item): RequestRoute("bulk_update_list_items", BulkUpdateListItems),
+    (Operation.bulk_delete, ObjectType.list_item): RequestRoute("bulk_delete_list_items", BulkDeleteListItems),
+}
+
+_routes_by_value = {
+    (operation.value, object_type.value): route for (operation, object_type), route in REQUEST_ROUTES.items()
+}
+"""routes keyed by raw request values, so requests can be routed without validating them as MessageRequests"""
+
+
+def _get_request_key(raw_request: dict[str, Any]) -> Optional[str]:
+    """
+    Requests against the same list must run in order. Requests which aren't scoped
+    to a single list (e.g. creating a list or reading all lists) have no key, so
+    they run on their own, as do requests whose list id isn't a string
+    """
+
+    object_data = raw_request.get("object_data")
+    if raw_request.get("operation") == Operation.read_all.value or not isinstance(object_data, dict):
+        return None
+
+    list_id = object_data.get("list_id") or object_data.get("listId")
+    return list_id if isinstance(list_id, str) else None
+
+
+def _get_message_operation(msg: ReceivedMessage) -> str:
+    """The operation all of a message's requests share, for reporting metrics"""
+
+    operations = {
+        operation if isinstance(operation, str) else "invalid"
+        for operation in (raw_request.get("operation") for raw_request in msg.requests)
+    }
+    return operations.pop() if len(operations) == 1 else "mixed"
+
+
+@timed("MessageRequest.parse")
+def _parse_request(raw_request: dict[str, Any]) -> tuple[RequestRoute, Optional[BaseModel]]:
+    """Look up the route for a message request and parse its object data, raising a ValueError if either is invalid"""
+
+    operation = raw_request.get("operation")
+    object_type = raw_request.get("object_type")
+    if not isinstance(operation, str) or not isinstance(object_type, str):
+        raise ValueError(f"{operation} is not a supported operation for {object_type} objects")
+
+    route = _routes_by_value.get((operation, object_type))
+    if not route:
+        raise ValueError(f"{operation} is not a supported operation for {object_type} objects")
+
+    return route, route.model.parse_obj(raw_request.get("object_data")) if route.model else None
 
-    # default response if there is no operation + object_type match
-    response_body: MessageResponseBody = MessageResponseBody(
-        success=False, detail="invalid operation + object_type parameters"
-    )
+
+def _process_request(
+    list_management: ListManagement, raw_request: dict[str, Any]
+) -> tuple[Optional[Error], Optional[dict[str, Any]]]:
+    """
+    Process a single message request, returning its error (if it failed) and its serialized response.
+    Alexa's response object isn't returned, so only the serialized copy is held until the message is done
+    """
+
+    error: Optional[Error] = None
+    response_data: Optional[dict[str, Any]] = None
 
     try:
-        responses: list[dict[str, Any]] = []
-        for msg_request in msg.requests:
-            response: Optional[Union[Error, object]] = None
-            response_data: Optional[dict[str, Any]] = None
+        # pydantic's ValidationError is a ValueError
+        (route, data) = _parse_request(raw_request)
+        method = getattr(list_management, route.method)
+        response = method(data) if route.model else method()
+        if isinstance(response, Error):
+            error = response
+
+        if response:
+            response_data = response.to_dict()
 
-            if msg_request.operation == Operation.read_all:
-                if msg_request.object_type == ObjectType.list:
-                    response = list_management.read_all_lists()
-                    response_data = response.to_dict()
+    except ValueError as e:
+        logging.info(f"invalid message request: {e}")
+        error = Error(message=str(e))
+        response_data = error.to_dict()
 
-            elif msg_request.operation == Operation.read:
-                if msg_request.object_type == ObjectType.list:
-                    response = list_management.read_list(ReadList.parse_obj(msg_request.object_data))
-                    response_data = response.to_dict()
+    except ServiceException as e:
+        logging.info(f"Alexa service exception: {e}")
+        error = e.body if isinstance(e.body, Error) else Error(message=str(e))
+        response_data = error.to_dict()
 
-                elif msg_request.object_type == ObjectType.list_item:
-                    response = list_management.read_list_item(ReadListItem.parse_obj(msg_request.object_data))
-                    response_data = response.to_dict()
+    except Exception as e:
+        # requests run alongside each other, so one failing mustn't discard the others' results
+        logging.exception(f"unable to process message request: {e}")
+        error = Error(message=f"{type(e).__name__}: {e}")
+        response_data = error.to_dict()
 
-            else:
-                if msg_request.object_type == ObjectType.list:
-                    if msg_request.operation == Operation.create:
-                        response = list_management.create_list(CreateList.parse_obj(msg_request.object_data))
-                        response_data = response.to_dict()
+    if response_data:
+        response_data["metadata"] = raw_request.get("metadata")
 
-                    elif msg_request.operation == Operation.update:
-                        response = list_management.update_list(UpdateList.parse_obj(msg_request.object_data))
+    return error, response_data
 
-                        if response:
-                            response_data = response.to_dict()
 
-                    elif msg_request.operation == Operation.delete:
-                        response = list_management.delete_list(DeleteList.parse_obj(msg_request.object_data))
+def _stream_request(
+    list_management: ListManagement, raw_request: dict[str, Any], stream: CallbackEventStream, seq: int
+) -> tuple[Optional[Error], None]:
+    """Process a request and write its response straight to the callback stream, so it's dropped once it's written"""
 
-                        if response:
-                            response_data = response.to_dict()
+    (error, response_data) = _process_request(list_management, raw_request)
+    with span("Message.serialize"):
+        stream.write(seq, response_data)
 
-                elif msg_request.object_type == ObjectType.list_item:
-                    if msg_request.operation == Operation.create:
-                        response = list_management.create_list_item(CreateListItem.parse_obj(msg_request.object_data))
+    return error, None
 
-                        response_data = response.to_dict()
 
-                    elif msg_request.operation == Operation.update:
-                        response = list_management.update_list_item(UpdateListItem.parse_obj(msg_request.object_data))
+def _write_callback(msg: ReceivedMessage, body: dict[str, Any]) -> None:
+    """Write a message's response body to DynamoDB; the serialized copies are dropped once it's written"""
 
-                        if response:
-                            response_data = response.to_dict()
+    with span("Message.serialize"):
+        callback = CallbackEvent.from_data(event_source=msg.source, event_id=msg.event_id, data=body)
+
+    event_db.put_chunked(
+        callback.dict(exclude_none=True), "event_id", "data_compressed", expiration=CALLBACK_EVENT_EXPIRATION
+    )
 
-                    elif msg_request.operation == Operation.delete:
-                        response = list_management.delete_list_item(DeleteListItem.parse_obj(msg_request.object_data))
 
-                        if response:
-                            response_data = response.to_dict()
+@sb.request_type_handler("Messaging.MessageReceived")
+def route_message(input: HandlerInput) -> Response:
+    client = input.service_client_factory.get_list_management_service()
+    list_management = get_list_management(client, cast(Optional[str], get_user_id(input)))
 
-            if response_data:
-                response_data["metadata"] = msg_request.metadata
-                responses.append(response_data)
+    request = cast(
+        MessageReceivedRequest,
+        input.request_envelope.request,
+    )
 
-    except ServiceException:
-        response_body = MessageResponseBody(
-            success=False,
-            detail="Alexa service exception; are the provided object ids accurate?",
+    message_data = request.message
+    if not message_data:
+        return input.response_builder.response
+
+    with span("Message.parse"):
+        msg = ReceivedMessage.parse_obj(message_data)
+
+    logging.info(f"received message {msg.event_id}")
+    if METRICS_ENABLED:
+        set_operation(_get_message_operation(msg))
+
+    stream: Optional[CallbackEventStream] = None
+    tasks: list[Callable[[], tuple[Optional[Error], Optional[dict[str, Any]]]]]
+    if msg.send_callback_response and msg.stream_callback_response:
+        stream = CallbackEventStream(
+            event_db, msg.source, msg.event_id, len(msg.requests), expiration=CALLBACK_EVENT_EXPIRATION
         )
+        stream.open()
+        tasks = [
+            partial(_stream_request, list_management, raw_request, stream, seq)
+            for seq, raw_request in enumerate(msg.requests)
+        ]
 
     else:
-        response_body = MessageResponseBody(
-            success=not isinstance(response, Error),
-            data=responses,
+        tasks = [partial(_process_request, list_management, raw_request) for raw_request in msg.requests]
+
+    # independent requests are sent to Alexa concurrently; results keep the original request order
+    completed = False
+    try:
+        results = execute_ordered(
+            tasks, [_get_request_key(raw_request) for raw_request in msg.requests], max_workers=MESSAGE_CONCURRENCY
         )
+        completed = True
 
-    message_response = MessageResponse(source_message=msg, body=response_body)
+    finally:
+        # don't leave the manifest saying the response is still being written
+        if stream and not completed:
+            stream.close(success=False, detail="the message could not be processed")
 
-    # write response to DynamoDB
-    if msg.send_callback_response:
-        callback = CallbackEvent(
-            event_source=message_response.source_message.source,
-            event_id=message_response.source_message.event_id,
-            data=json.dumps(message_response.body.dict(exclude_none=True)),
-        )
+    failures = sum(error is not None for error, _ in results)
+    detail: Optional[str] = None
+    if failures:
+        detail = f"{failures} of {len(msg.requests)} requests failed; are the provided object ids accurate?"
+
+    # the responses are shared between the callback and the API response rather than being copied
+    # into a MessageResponse, so only one copy of them is held however large they are
+    body = MessageResponseBody(success=not failures, detail=detail).dict(exclude_none=True)
+    if stream:
+        stream.close(success=not failures, detail=detail)
+
+    else:
+        body["data"] = [response_data for _, response_data in results if response_data]
+        if msg.send_callback_response:
+            _write_callback(msg, body)
 
-        event_db.put(callback.dict(exclude_none=True), CALLBACK_EVENT_EXPIRATION)
+    source_message = msg.dict(exclude={"requests"}, exclude_none=True)
+    source_message["requests"] = msg.requests
+    input.response_builder.set_api_response({"source_message": source_message, "body": body})
 
-    input.response_builder.set_api_response(message_response.dict(exclude_none=True))
     return input.response_builder.response
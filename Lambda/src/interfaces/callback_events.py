@@ -0,0 +1,63 @@
+import threading
+from typing import Any, Optional
+
+from ..models.dynamodb import CallbackEvent
+from .dynamodb import DynamoDB, get_chunk_key
+
+
+class CallbackEventStream:
+    """
+    Writes a message's responses to the callback table one chunk at a time, as each request completes.
+
+    The manifest is keyed by the event id and is written first, with the number of chunks to expect.
+    Chunk `n` holds the response to the message's `n`th request and is keyed `{event_id}/{n}`, using the
+    same scheme as items `put_chunked` splits up. Once every chunk is written the manifest is rewritten
+    as complete, along with the message's result. If the message fails part way through, the manifest
+    is rewritten as complete but unsuccessful, and the missing chunks are never written.
+
+    Memory use is bounded by the largest single response, not by the size of the whole message
+    """
+
+    def __init__(self, db: DynamoDB, event_source: str, event_id: str, chunk_count: int, expiration: int) -> None:
+        self.db = db
+        self.event_source = event_source
+        self.event_id = event_id
+        self.chunk_count = chunk_count
+        self.expiration = expiration
+
+        self.written = 0
+        self._lock = threading.Lock()
+
+    def _put(self, callback: CallbackEvent) -> None:
+        self.db.put_chunked(callback.dict(exclude_none=True), "event_id", "data_compressed", expiration=self.expiration)
+
+    def _put_manifest(self, body: dict[str, Any], complete: bool) -> None:
+        manifest = CallbackEvent.from_data(self.event_source, self.event_id, body)
+        manifest.chunk_count = self.chunk_count
+        manifest.complete = complete
+        self._put(manifest)
+
+    def open(self) -> None:
+        self._put_manifest({"success": False, "detail": "the response is still being written"}, complete=False)
+
+    def write(self, seq: int, response_data: Optional[dict[str, Any]]) -> None:
+        """Write the response to a single request; requests without a response are written as null"""
+
+        if not 0 <= seq < self.chunk_count:
+            raise ValueError(f"chunk {seq} is out of range for a stream of {self.chunk_count} chunks")
+
+        self._put(CallbackEvent.from_data(self.event_source, get_chunk_key(self.event_id, seq), response_data))
+        with self._lock:
+            self.written += 1
+
+    def close(self, success: bool, detail: Optional[str] = None) -> None:
+        """Mark the stream as complete; a failed stream may be closed before all of its chunks are written"""
+
+        if success and self.written != self.chunk_count:
+            raise ValueError(f"only {self.written} of {self.chunk_count} chunks were written")
+
+        body: dict[str, Any] = {"success": success}
+        if detail:
+            body["detail"] = detail
+
+        self._put_manifest(body, complete=True)
@@ -0,0 +1,77 @@
+import logging
+import threading
+from typing import Any, Optional
+
+from ..models.dynamodb import ProcessedListEvent
+from ..utils.cache import TTLCache
+from .dynamodb import DynamoDB
+
+
+class ListEventDeduplicator:
+    """
+    Tracks which list events have already been processed, so events Alexa redelivers aren't sent to
+    the Unified Shopping List API again. Recently seen request ids are kept in a per-container cache,
+    and, if a table is provided, claimed in DynamoDB so redeliveries to other containers are caught too
+    """
+
+    def __init__(self, tablename: Optional[str], ttl: int, cache_size: int = 1024) -> None:
+        self.db = DynamoDB(tablename) if tablename else None
+        self.ttl = ttl
+        self.cache: TTLCache[bool] = TTLCache(ttl, cache_size)
+
+        self.claimed = 0
+        self.suppressed_local = 0
+        self.suppressed_remote = 0
+        self._lock = threading.Lock()
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def claim(self, request_id: str) -> bool:
+        """
+        Claim a list event for processing, returning False if it has already been claimed. If the
+        event can't be processed, call `release` so the event is processed when Alexa redelivers it
+        """
+
+        if self.cache.get(request_id):
+            self._count("suppressed_local")
+            return False
+
+        if self.db:
+            try:
+                item = ProcessedListEvent(request_id=request_id)
+                if not self.db.put_if_not_exists(item.dict(exclude_none=True), "request_id", self.ttl):
+                    self.cache.set(request_id, True)
+                    self._count("suppressed_remote")
+                    return False
+
+            except Exception as e:
+                # sending a duplicate event is better than dropping one
+                logging.info(f"unable to claim list event {request_id}; processing it anyway. {type(e).__name__}: {e}")
+
+        self.cache.set(request_id, True)
+        self._count("claimed")
+        return True
+
+    def release(self, request_id: str) -> None:
+        """Release a claimed list event so it will be processed again if it's redelivered"""
+
+        self.cache.invalidate(request_id)
+        if not self.db:
+            return
+
+        try:
+            self.db.delete("request_id", request_id)
+
+        except Exception as e:
+            logging.info(f"unable to release list event {request_id}. {type(e).__name__}: {e}")
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "claimed": self.claimed,
+                "suppressed_local": self.suppressed_local,
+                "suppressed_remote": self.suppressed_remote,
+                "suppressed": self.suppressed_local + self.suppressed_remote,
+            }
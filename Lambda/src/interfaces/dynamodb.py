@@ -1,20 +1,57 @@
+import os
+import queue
+import random
+import threading
 import time
 from math import ceil
-from typing import Any, Optional
+from typing import Any, Iterable, Iterator, Optional
 
-from dynamodb_json import json_util as ddb_json  # type: ignore
+from ..skill import get_aws_client
+from ..utils.metrics import timed
+from .dynamodb_codec import deserialize_item, serialize_item
 
-from ..skill import aws_session
+DYNAMODB_ENDPOINT_URL = os.getenv("dynamoDBEndpointUrl") or None
+"""set this to point at a local DynamoDB stand-in (e.g. DynamoDB Local)"""
 
-ddb = aws_session.client("dynamodb")
+MAX_CHUNK_BYTES = 350 * 1024
+"""DynamoDB items are limited to 400 KB, so leave room for keys and other attributes"""
+
+BATCH_WRITE_LIMIT = 25
+BATCH_GET_LIMIT = 100
+SCAN_QUEUE_SIZE = 4
+"""how many pages a parallel scan may read ahead of the consumer"""
+
+
+def _backoff(attempt: int, base: float = 0.05, cap: float = 2) -> None:
+    time.sleep(random.uniform(0, min(cap, base * 2**attempt)))
+
+
+def get_chunk_key(key_value: str, seq: int) -> str:
+    """The key of an item's `seq`th chunk; every item split across chunks uses this scheme"""
+
+    return f"{key_value}/{seq}"
+
+
+def _chunk(values: list[Any], size: int) -> Iterator[list[Any]]:
+    for i in range(0, len(values), size):
+        yield values[i : i + size]
 
 
 class DynamoDB:
-    """Provides higher-level functions to interact with DynamoDB"""
+    """
+    Provides higher-level functions to interact with DynamoDB. Numbers which aren't integers
+    are read back as Decimals, so they round-trip exactly
+    """
 
-    def __init__(self, tablename: str, ttl_column: str = "expires") -> None:
+    def __init__(self, tablename: str, ttl_column: str = "expires", max_attempts: int = 8) -> None:
         self.tablename = tablename
         self.ttl_column = ttl_column
+        self.max_attempts = max_attempts
+        """how many times to send unprocessed batch items before giving up"""
+
+    @property
+    def client(self) -> Any:
+        return get_aws_client("dynamodb", endpoint_url=DYNAMODB_ENDPOINT_URL)
 
     def _generate_ttl_timestamp(self, seconds: int, start: Optional[int] = None) -> int:
         """Generates a UNIX timestamp to expire an item after a certain amount of time"""
@@ -22,16 +59,232 @@ class DynamoDB:
         start = start or ceil(time.time())
         return start + seconds
 
-    def get(self, key: str, value: str) -> dict[str, Any]:
-        """Gets a single item by primary key"""
+    def _serialize(self, item: dict[str, Any], expiration: Optional[int] = None) -> dict[str, Any]:
+        if expiration:
+            item[self.ttl_column] = self._generate_ttl_timestamp(expiration)
 
-        data = ddb.get_item(TableName=self.tablename, Key={key: {"S": value}})
-        return ddb_json.loads(data["Item"])
+        return serialize_item(item)
 
-    def put(self, item: dict[str, Any], expiration: Optional[int] = None) -> None:
-        """Creates or updates a single item. Optionally set the expiration time in seconds"""
+    @timed("DynamoDB.get")
+    def get(self, key: str, value: str) -> Optional[dict[str, Any]]:
+        """Gets a single item by primary key, or None if it doesn't exist"""
 
-        if expiration:
-            item[self.ttl_column] = self._generate_ttl_timestamp(expiration)
+        data = self.client.get_item(TableName=self.tablename, Key={key: {"S": value}})
+        if "Item" not in data:
+            return None
+
+        return deserialize_item(data["Item"], use_decimal=True)
+
+    @timed("DynamoDB.put")
+    def put(
+        self,
+        item: dict[str, Any],
+        expiration: Optional[int] = None,
+        condition_expression: Optional[str] = None,
+        **kwargs,
+    ) -> bool:
+        """
+        Creates or updates a single item. Optionally set the expiration time in seconds.
+
+        If a condition expression is provided, the item is only written if the condition is met;
+        returns False if the condition failed. Additional keyword arguments (such as
+        ExpressionAttributeValues) are passed through to the DynamoDB put call
+        """
+
+        if condition_expression:
+            kwargs["ConditionExpression"] = condition_expression
+
+        try:
+            self.client.put_item(TableName=self.tablename, Item=self._serialize(item, expiration), **kwargs)
+            return True
+
+        except self.client.exceptions.ConditionalCheckFailedException:
+            return False
+
+    def put_if_not_exists(self, item: dict[str, Any], key: str, expiration: Optional[int] = None) -> bool:
+        """Creates an item only if no item with the same primary key exists; returns False if one does"""
+
+        return self.put(
+            item,
+            expiration,
+            condition_expression="attribute_not_exists(#key)",
+            ExpressionAttributeNames={"#key": key},
+        )
+
+    def delete(self, key: str, value: str) -> None:
+        """Deletes a single item by primary key, if it exists"""
+
+        self.client.delete_item(TableName=self.tablename, Key={key: {"S": value}})
+
+    def put_chunked(self, item: dict[str, Any], key: str, attribute: str, expiration: Optional[int] = None) -> None:
+        """
+        Creates or updates an item with a binary attribute which may be too large for a single item.
+        Large values are split across chunk items keyed `{key value}/{n}`, and the item records how
+        many chunks there are in `{attribute}_chunks`. Read it back with `get_chunked`
+        """
+
+        value: Optional[bytes] = item.get(attribute)
+        if not value or len(value) <= MAX_CHUNK_BYTES:
+            self.put(item, expiration)
+            return
+
+        item_key = item[key]
+        chunks = [value[i : i + MAX_CHUNK_BYTES] for i in range(0, len(value), MAX_CHUNK_BYTES)]
+
+        # write the chunks first so readers never see an item whose chunks are missing
+        self.batch_put(
+            ({key: get_chunk_key(item_key, i), attribute: chunk} for i, chunk in enumerate(chunks)), expiration
+        )
+
+        item = {k: v for k, v in item.items() if k != attribute}
+        item[f"{attribute}_chunks"] = len(chunks)
+        self.put(item, expiration)
+
+    def get_chunked(self, key: str, value: str, attribute: str) -> Optional[dict[str, Any]]:
+        """Gets a single item by primary key, reassembling a binary attribute written by `put_chunked`"""
+
+        item = self.get(key, value)
+        if not item:
+            return None
+
+        chunk_count = item.pop(f"{attribute}_chunks", None)
+        if not chunk_count:
+            return item
+
+        chunk_keys = [get_chunk_key(value, i) for i in range(chunk_count)]
+        chunks = {chunk[key]: chunk[attribute] for chunk in self.batch_get(key, chunk_keys)}
+        if len(chunks) != chunk_count:
+            raise ValueError(f"item {value} is missing {chunk_count - len(chunks)} of its {chunk_count} chunks")
+
+        item[attribute] = b"".join(chunks[chunk_key] for chunk_key in chunk_keys)
+        return item
+
+    def _batch_write(self, requests: list[dict[str, Any]]) -> None:
+        for chunk in _chunk(requests, BATCH_WRITE_LIMIT):
+            request_items = {self.tablename: chunk}
+            for attempt in range(self.max_attempts):
+                response = self.client.batch_write_item(RequestItems=request_items)
+                request_items = response.get("UnprocessedItems") or {}
+                if not request_items:
+                    break
+
+                _backoff(attempt)
+
+            else:
+                raise Exception(f"unable to write {len(request_items[self.tablename])} items to {self.tablename}")
+
+    def batch_put(self, items: Iterable[dict[str, Any]], expiration: Optional[int] = None) -> None:
+        """Creates or updates many items, 25 per request, retrying any that DynamoDB doesn't process"""
+
+        self._batch_write([{"PutRequest": {"Item": self._serialize(item, expiration)}} for item in items])
+
+    def batch_delete(self, key: str, values: Iterable[str]) -> None:
+        """Deletes many items by primary key, 25 per request, retrying any that DynamoDB doesn't process"""
+
+        self._batch_write([{"DeleteRequest": {"Key": {key: {"S": value}}}} for value in values])
+
+    def batch_get(self, key: str, values: Iterable[str]) -> list[dict[str, Any]]:
+        """
+        Gets many items by primary key, 100 per request, retrying any keys that DynamoDB doesn't
+        process. Missing items are skipped, and items are not returned in any particular order
+        """
+
+        items: list[dict[str, Any]] = []
+        for chunk in _chunk(list(dict.fromkeys(values)), BATCH_GET_LIMIT):
+            request_items = {self.tablename: {"Keys": [{key: {"S": value}} for value in chunk]}}
+            for attempt in range(self.max_attempts):
+                response = self.client.batch_get_item(RequestItems=request_items)
+                items.extend(
+                    deserialize_item(item, use_decimal=True) for item in response["Responses"].get(self.tablename, [])
+                )
+
+                request_items = response.get("UnprocessedKeys") or {}
+                if not request_items:
+                    break
+
+                _backoff(attempt)
+
+            else:
+                raise Exception(
+                    f"unable to read {len(request_items[self.tablename]['Keys'])} items from {self.tablename}"
+                )
+
+        return items
+
+    def _paginate(self, operation: str, **kwargs: Any) -> Iterator[list[dict[str, Any]]]:
+        paginator = self.client.get_paginator(operation)
+        for page in paginator.paginate(TableName=self.tablename, **kwargs):
+            yield page["Items"]
+
+    def query(self, key_condition_expression: str, **kwargs: Any) -> Iterator[dict[str, Any]]:
+        """
+        Queries the table one page at a time, yielding each item. Keyword arguments
+        (such as ExpressionAttributeValues) are passed through to the DynamoDB query call
+        """
+
+        for page in self._paginate("query", KeyConditionExpression=key_condition_expression, **kwargs):
+            for item in page:
+                yield deserialize_item(item, use_decimal=True)
+
+    def scan(self, segments: int = 1, **kwargs: Any) -> Iterator[dict[str, Any]]:
+        """
+        Scans the table one page at a time, yielding each item. Keyword arguments
+        (such as a FilterExpression) are passed through to the DynamoDB scan call.
+
+        With more than one segment, the segments are scanned in parallel and items are
+        yielded in no particular order. Only a few pages are read ahead of the consumer,
+        so memory use doesn't grow with the size of the table
+        """
+
+        pages = self._paginate("scan", **kwargs) if segments <= 1 else self._scan_segments(segments, **kwargs)
+        for page in pages:
+            for item in page:
+                yield deserialize_item(item, use_decimal=True)
+
+    def _scan_segments(self, segments: int, **kwargs: Any) -> Iterator[list[dict[str, Any]]]:
+        pages: queue.Queue = queue.Queue(maxsize=SCAN_QUEUE_SIZE)
+        stop = threading.Event()
+        done = object()
+
+        def offer(value: Any) -> bool:
+            while not stop.is_set():
+                try:
+                    pages.put(value, timeout=0.1)
+                    return True
+
+                except queue.Full:
+                    continue
+
+            return False
+
+        def scan_segment(segment: int) -> None:
+            try:
+                for page in self._paginate("scan", Segment=segment, TotalSegments=segments, **kwargs):
+                    if not offer(page):
+                        return
+
+                offer(done)
+
+            except Exception as e:
+                offer(e)
+
+        workers = [threading.Thread(target=scan_segment, args=(i,), daemon=True) for i in range(segments)]
+        for worker in workers:
+            worker.start()
+
+        try:
+            remaining = segments
+            while remaining:
+                value = pages.get()
+                if value is done:
+                    remaining -= 1
+
+                elif isinstance(value, Exception):
+                    raise value
+
+                else:
+                    yield value
 
-        ddb.put_item(TableName=self.tablename, Item=ddb_json.dumps(item, as_dict=True))
+        finally:
+            # stop the workers if the consumer stops early or a segment fails
+            stop.set()
@@ -0,0 +1,133 @@
+import math
+from collections.abc import Mapping
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable
+from uuid import UUID
+
+DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+
+
+def _serialize_float(value: float) -> dict[str, Any]:
+    if math.isnan(value) or math.isinf(value):
+        raise ValueError(f"DynamoDB does not support {value}")
+
+    # repr is the shortest string which round-trips to the same float
+    return {"N": repr(value)}
+
+
+def _serialize_set(value: Any) -> dict[str, Any]:
+    if not value:
+        # an empty list would be written instead, which reads back as a list rather than a set
+        raise ValueError("DynamoDB does not support empty sets")
+
+    if all(isinstance(v, str) for v in value):
+        return {"SS": list(value)}
+
+    if all(isinstance(v, (bytes, bytearray)) for v in value):
+        return {"BS": [bytes(v) for v in value]}
+
+    if all(isinstance(v, (int, float, Decimal)) and not isinstance(v, bool) for v in value):
+        return {"NS": [serialize_value(v)["N"] for v in value]}
+
+    raise TypeError("sets must contain only strings, only numbers, or only bytes")
+
+
+_SERIALIZERS: dict[type, Callable[[Any], dict[str, Any]]] = {
+    str: lambda v: {"S": v},
+    bool: lambda v: {"BOOL": v},
+    int: lambda v: {"N": str(v)},
+    float: _serialize_float,
+    Decimal: lambda v: {"N": str(v)},
+    type(None): lambda v: {"NULL": True},
+    bytes: lambda v: {"B": v},
+    bytearray: lambda v: {"B": bytes(v)},
+    dict: lambda v: {"M": serialize_item(v)},
+    list: lambda v: {"L": [serialize_value(i) for i in v]},
+    tuple: lambda v: {"L": [serialize_value(i) for i in v]},
+    set: _serialize_set,
+    frozenset: _serialize_set,
+    datetime: lambda v: {"S": v.strftime(DATETIME_FORMAT)},
+    UUID: lambda v: {"S": v.hex},
+}
+
+
+def serialize_value(value: Any) -> dict[str, Any]:
+    """Convert a Python value directly into a DynamoDB attribute value, without going through JSON"""
+
+    serializer = _SERIALIZERS.get(type(value))
+    if serializer:
+        return serializer(value)
+
+    # subclasses of the supported types are uncommon, so they take the slow path
+    if isinstance(value, Enum):
+        return serialize_value(value.value)
+
+    if isinstance(value, Mapping):
+        return {"M": serialize_item(value)}
+
+    for cls, serializer in _SERIALIZERS.items():
+        if isinstance(value, cls):
+            return serializer(value)
+
+    raise TypeError(f"unable to serialize {type(value).__name__} to DynamoDB")
+
+
+def serialize_item(item: Mapping[str, Any]) -> dict[str, Any]:
+    """Convert a dictionary into a DynamoDB item (a map of attribute values)"""
+
+    return {str(k): serialize_value(v) for k, v in item.items()}
+
+
+def _deserialize_number(value: str, use_decimal: bool) -> Any:
+    if "." not in value and "e" not in value and "E" not in value:
+        return int(value)
+
+    return Decimal(value) if use_decimal else float(value)
+
+
+def deserialize_value(attribute: dict[str, Any], use_decimal: bool = False) -> Any:
+    """
+    Convert a DynamoDB attribute value into a Python value. Integers are always returned
+    as ints; other numbers are returned as floats, or as Decimals if `use_decimal` is set
+    """
+
+    (attribute_type, value) = next(iter(attribute.items()))
+    if attribute_type == "S":
+        return value
+
+    if attribute_type == "N":
+        return _deserialize_number(value, use_decimal)
+
+    if attribute_type == "M":
+        return deserialize_item(value, use_decimal)
+
+    if attribute_type == "L":
+        return [deserialize_value(v, use_decimal) for v in value]
+
+    if attribute_type == "BOOL":
+        return value
+
+    if attribute_type == "NULL":
+        return None
+
+    if attribute_type == "B":
+        return bytes(value)
+
+    if attribute_type == "SS":
+        return set(value)
+
+    if attribute_type == "NS":
+        return {_deserialize_number(v, use_decimal) for v in value}
+
+    if attribute_type == "BS":
+        return {bytes(v) for v in value}
+
+    raise TypeError(f"unknown DynamoDB attribute type {attribute_type}")
+
+
+def deserialize_item(item: Mapping[str, Any], use_decimal: bool = False) -> dict[str, Any]:
+    """Convert a DynamoDB item (a map of attribute values) into a dictionary"""
+
+    return {k: deserialize_value(v, use_decimal) for k, v in item.items()}
@@ -1,4 +1,6 @@
-from typing import Optional, Union, cast
+import logging
+from functools import partial
+from typing import Any, Callable, Hashable, Optional, Sequence, TypeVar, Union, cast
 
 from ask_sdk_model.services.list_management.alexa_list import AlexaList
 from ask_sdk_model.services.list_management.alexa_list_item import AlexaListItem
@@ -10,17 +12,43 @@ from ask_sdk_model.services.list_management.error import Error
 from ask_sdk_model.services.list_management.list_management_service_client import (
     ListManagementServiceClient,
 )
+from ask_sdk_model.services.service_exception import ServiceException
 
+from ..models._base import AlexaBase
 from ..models.lists import (
+    BulkCreateListItems,
+    BulkDeleteListItems,
+    BulkListItemResult,
+    BulkListItemsResult,
+    BulkUpdateListItems,
     CreateList,
     CreateListItem,
     DeleteList,
     DeleteListItem,
+    ListDelta,
     ReadList,
+    ReadListDelta,
     ReadListItem,
     UpdateList,
     UpdateListItem,
 )
+from ..skill import (
+    LIST_BULK_CONCURRENCY,
+    LIST_CACHE_MAX_SIZE,
+    LIST_CACHE_TTL,
+    LIST_SNAPSHOT_TABLENAME,
+)
+from ..utils.cache import TTLCache
+from ..utils.concurrency import execute_ordered
+from ..utils.metrics import timed
+from .list_snapshots import ListSnapshotStore
+
+T = TypeVar("T")
+
+list_cache: TTLCache[object] = TTLCache(ttl=LIST_CACHE_TTL, max_size=LIST_CACHE_MAX_SIZE)
+"""cached Alexa list responses, keyed by (user id, list id, ...) and shared across warm invocations"""
+
+list_snapshots = ListSnapshotStore(LIST_SNAPSHOT_TABLENAME) if LIST_SNAPSHOT_TABLENAME else None
 
 
 class ListManagement:
@@ -29,6 +57,7 @@ class ListManagement:
     def __init__(self, client: ListManagementServiceClient) -> None:
         self.client = client
 
+    @timed("ListManagement.read_all_lists")
     def read_all_lists(
         self,
     ) -> Union[AlexaListsMetadata, Error]:
@@ -38,6 +67,7 @@ class ListManagement:
 
         return cast(AlexaListsMetadata, response)
 
+    @timed("ListManagement.read_list")
     def read_list(self, alexa_list: ReadList) -> Union[AlexaList, Error]:
         response = self.client.get_list(list_id=alexa_list.list_id, status=alexa_list.state.value)
         if isinstance(response, Error):
@@ -45,6 +75,53 @@ class ListManagement:
 
         return cast(AlexaList, response)
 
+    @timed("ListManagement.read_list_delta")
+    def read_list_delta(self, delta_request: ReadListDelta) -> Union[ListDelta, Error]:
+        """Read a list and return only the items which changed since the snapshot in the request"""
+
+        if not list_snapshots:
+            return Error(message="delta reads are not enabled; use read instead")
+
+        # a delta is only useful if it's current, so this always reads the list from Alexa, even when reads are cached
+        alexa_list = ListManagement.read_list(self, ReadList(list_id=delta_request.list_id, state=delta_request.state))
+        if isinstance(alexa_list, Error):
+            return alexa_list
+
+        state = delta_request.state.value
+        items = {item.id: item for item in alexa_list.items or [] if item.id}
+        versions = {item_id: item.version or 0 for item_id, item in items.items()}
+        token = list_snapshots.get_token(versions)
+
+        previous_versions: Optional[dict[str, int]] = None
+        if delta_request.snapshot_token:
+            # an unchanged list keeps using the same snapshot, so it must not expire while it's being read
+            previous_versions = list_snapshots.get(
+                delta_request.list_id,
+                state,
+                delta_request.snapshot_token,
+                refresh=token == delta_request.snapshot_token,
+            )
+
+        # the snapshot is keyed by its contents, so an unchanged list has nothing new to store
+        if token != delta_request.snapshot_token or previous_versions is None:
+            list_snapshots.put(delta_request.list_id, state, versions)
+
+        delta = ListDelta(list_id=delta_request.list_id, snapshot_token=token, full_sync=previous_versions is None)
+        if previous_versions is None:
+            delta.added = [item.to_dict() for item in items.values()]
+            return delta
+
+        for item_id, item in items.items():
+            if item_id not in previous_versions:
+                delta.added.append(item.to_dict())
+
+            elif versions[item_id] != previous_versions[item_id]:
+                delta.updated.append(item.to_dict())
+
+        delta.removed = [item_id for item_id in previous_versions if item_id not in items]
+        return delta
+
+    @timed("ListManagement.create_list")
     def create_list(self, alexa_list: CreateList) -> Union[AlexaListMetadata, Error]:
         response = self.client.create_list(alexa_list.request())
         if isinstance(response, Error):
@@ -52,6 +129,7 @@ class ListManagement:
 
         return cast(AlexaListMetadata, response)
 
+    @timed("ListManagement.update_list")
     def update_list(self, alexa_list: UpdateList) -> Optional[Error]:
         response = self.client.update_list(alexa_list.list_id, alexa_list.request())
         if isinstance(response, Error):
@@ -59,6 +137,7 @@ class ListManagement:
 
         return None
 
+    @timed("ListManagement.delete_list")
     def delete_list(self, alexa_list: DeleteList) -> Optional[Error]:
         response = self.client.delete_list(alexa_list.list_id)
         if isinstance(response, Error):
@@ -66,6 +145,7 @@ class ListManagement:
 
         return None
 
+    @timed("ListManagement.read_list_item")
     def read_list_item(self, list_item: ReadListItem) -> Union[AlexaListItem, Error]:
         response = self.client.get_list_item(list_id=list_item.list_id, item_id=list_item.item_id)
         if isinstance(response, Error):
@@ -73,6 +153,41 @@ class ListManagement:
 
         return cast(AlexaListItem, response)
 
+    def read_list_items(
+        self, list_id: str, item_ids: Sequence[str], read_list_min_items: int = 0
+    ) -> Union[list[AlexaListItem], Error]:
+        """
+        Read several items from a list concurrently, in the order they were requested. If at least
+        `read_list_min_items` items are requested, the list is read once instead and only the items
+        missing from it (e.g. completed items) are read individually
+        """
+
+        item_ids = list(dict.fromkeys(item_ids))
+        items: dict[str, AlexaListItem] = {}
+        if read_list_min_items and len(item_ids) >= read_list_min_items:
+            alexa_list = self.read_list(ReadList(list_id=list_id))
+            if isinstance(alexa_list, Error):
+                return alexa_list
+
+            requested = set(item_ids)
+            items = {item.id: item for item in alexa_list.items or [] if item.id in requested}
+
+        missing = [item_id for item_id in item_ids if item_id not in items]
+        responses = execute_ordered(
+            [partial(self.read_list_item, ReadListItem(list_id=list_id, item_id=item_id)) for item_id in missing],
+            missing,
+            max_workers=LIST_BULK_CONCURRENCY,
+        )
+
+        for item_id, response in zip(missing, responses):
+            if isinstance(response, Error):
+                return response
+
+            items[item_id] = response
+
+        return [items[item_id] for item_id in item_ids]
+
+    @timed("ListManagement.create_list_item")
     def create_list_item(self, alexa_item: CreateListItem) -> Union[AlexaListItem, Error]:
         response = self.client.create_list_item(alexa_item.list_id, alexa_item.request())
         if isinstance(response, Error):
@@ -80,18 +195,156 @@ class ListManagement:
 
         return cast(AlexaListItem, response)
 
+    @timed("ListManagement.update_list_item")
     def update_list_item(self, alexa_item: UpdateListItem) -> Optional[Error]:
-        response = self.client.update_list_item(
-            alexa_item.list_id, alexa_item.item_id, alexa_item.request()
-        )
+        response = self.client.update_list_item(alexa_item.list_id, alexa_item.item_id, alexa_item.request())
         if isinstance(response, Error):
             return response
 
         return None
 
+    @timed("ListManagement.delete_list_item")
     def delete_list_item(self, alexa_item: DeleteListItem) -> Optional[Error]:
         response = self.client.delete_list_item(alexa_item.list_id, alexa_item.item_id)
         if isinstance(response, Error):
             return response
 
         return None
+
+    def _write_bulk(
+        self, list_id: str, items: Sequence[AlexaBase], write: Callable[[Any], Union[AlexaListItem, Error, None]]
+    ) -> BulkListItemsResult:
+        """Write each item with bounded concurrency, reporting failures per item rather than failing the batch"""
+
+        def write_item(item: AlexaBase) -> BulkListItemResult:
+            item_id: Optional[str] = getattr(item, "item_id", None)
+            try:
+                response = write(item)
+
+            except ServiceException as e:
+                error = e.body if isinstance(e.body, Error) else Error(message=str(e))
+                return BulkListItemResult(id=item_id, error=error.message)
+
+            except Exception as e:
+                # items are written alongside each other, so one failing mustn't discard the others' results
+                logging.exception(f"unable to write list item {item_id}: {e}")
+                return BulkListItemResult(id=item_id, error=f"{type(e).__name__}: {e}")
+
+            if isinstance(response, Error):
+                return BulkListItemResult(id=item_id, error=response.message)
+
+            if isinstance(response, AlexaListItem):
+                return BulkListItemResult(id=response.id, version=response.version)
+
+            return BulkListItemResult(id=item_id)
+
+        results = execute_ordered(
+            [partial(write_item, item) for item in items], list(range(len(items))), max_workers=LIST_BULK_CONCURRENCY
+        )
+
+        return BulkListItemsResult(
+            list_id=list_id, results=results, failed=sum(result.error is not None for result in results)
+        )
+
+    def bulk_create_list_items(self, bulk_request: BulkCreateListItems) -> BulkListItemsResult:
+        return self._write_bulk(
+            bulk_request.list_id,
+            bulk_request.items,
+            lambda item: self.create_list_item(item.cast(CreateListItem, list_id=bulk_request.list_id)),
+        )
+
+    def bulk_update_list_items(self, bulk_request: BulkUpdateListItems) -> BulkListItemsResult:
+        return self._write_bulk(
+            bulk_request.list_id,
+            bulk_request.items,
+            lambda item: self.update_list_item(item.cast(UpdateListItem, list_id=bulk_request.list_id)),
+        )
+
+    def bulk_delete_list_items(self, bulk_request: BulkDeleteListItems) -> BulkListItemsResult:
+        return self._write_bulk(
+            bulk_request.list_id,
+            bulk_request.items,
+            lambda item: self.delete_list_item(item.cast(DeleteListItem, list_id=bulk_request.list_id)),
+        )
+
+
+def invalidate_cached_list(user_id: str, list_id: Optional[str] = None) -> None:
+    """Drop a user's cached list, and their cached list metadata"""
+
+    def is_stale(key: Hashable) -> bool:
+        # keys are tuples of (user id, list id or None, ...)
+        return isinstance(key, tuple) and key[0] == user_id and key[1] in (list_id, None)
+
+    list_cache.invalidate_where(is_stale)
+
+
+class CachedListManagement(ListManagement):
+    """
+    List Management wrapper which caches reads per user. Writes made through the wrapper
+    invalidate the affected cache entries
+    """
+
+    def __init__(self, client: ListManagementServiceClient, user_id: str) -> None:
+        super().__init__(client)
+        self.user_id = user_id
+
+    def _read_through(self, key: Hashable, read: Callable[[], Union[T, Error]]) -> Union[T, Error]:
+        cached = list_cache.get(key)
+        if cached is not None:
+            return cast(T, cached)
+
+        response = read()
+        if not isinstance(response, Error):
+            list_cache.set(key, response)
+
+        return response
+
+    def read_all_lists(self) -> Union[AlexaListsMetadata, Error]:
+        return self._read_through((self.user_id, None), super().read_all_lists)
+
+    def read_list(self, alexa_list: ReadList) -> Union[AlexaList, Error]:
+        key = (self.user_id, alexa_list.list_id, alexa_list.state.value)
+        return self._read_through(key, lambda: super(CachedListManagement, self).read_list(alexa_list))
+
+    def read_list_item(self, list_item: ReadListItem) -> Union[AlexaListItem, Error]:
+        key = (self.user_id, list_item.list_id, "item", list_item.item_id)
+        return self._read_through(key, lambda: super(CachedListManagement, self).read_list_item(list_item))
+
+    def create_list(self, alexa_list: CreateList) -> Union[AlexaListMetadata, Error]:
+        response = super().create_list(alexa_list)
+        invalidate_cached_list(self.user_id)
+        return response
+
+    def update_list(self, alexa_list: UpdateList) -> Optional[Error]:
+        response = super().update_list(alexa_list)
+        invalidate_cached_list(self.user_id, alexa_list.list_id)
+        return response
+
+    def delete_list(self, alexa_list: DeleteList) -> Optional[Error]:
+        response = super().delete_list(alexa_list)
+        invalidate_cached_list(self.user_id, alexa_list.list_id)
+        return response
+
+    def create_list_item(self, alexa_item: CreateListItem) -> Union[AlexaListItem, Error]:
+        response = super().create_list_item(alexa_item)
+        invalidate_cached_list(self.user_id, alexa_item.list_id)
+        return response
+
+    def update_list_item(self, alexa_item: UpdateListItem) -> Optional[Error]:
+        response = super().update_list_item(alexa_item)
+        invalidate_cached_list(self.user_id, alexa_item.list_id)
+        return response
+
+    def delete_list_item(self, alexa_item: DeleteListItem) -> Optional[Error]:
+        response = super().delete_list_item(alexa_item)
+        invalidate_cached_list(self.user_id, alexa_item.list_id)
+        return response
+
+
+def get_list_management(client: ListManagementServiceClient, user_id: Optional[str] = None) -> ListManagement:
+    """Wrap a List Management client, caching reads for the user if the list cache is enabled"""
+
+    if LIST_CACHE_TTL > 0 and user_id:
+        return CachedListManagement(client, user_id)
+
+    return ListManagement(client)
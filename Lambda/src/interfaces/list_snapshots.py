@@ -0,0 +1,57 @@
+import hashlib
+import json
+import time
+from typing import Optional
+
+from ..models.dynamodb import ListSnapshot
+from .dynamodb import DynamoDB
+
+SNAPSHOT_EXPIRATION = 60 * 60 * 24 * 7
+"""clients which haven't synced in this long get a full sync"""
+SNAPSHOT_REFRESH_INTERVAL = 60 * 60 * 24
+"""how often an unchanged snapshot's expiration is extended while clients keep reading it"""
+
+
+class ListSnapshotStore:
+    """
+    DynamoDB-backed store of the item ids and versions in a list at a point in time, used to work
+    out which items changed between delta reads. Tokens are derived from the snapshot's contents,
+    so an unchanged list always produces the same token and is only rewritten to extend its expiration
+    """
+
+    def __init__(self, tablename: str, expiration: int = SNAPSHOT_EXPIRATION) -> None:
+        self.db = DynamoDB(tablename)
+        self.expiration = expiration
+
+    @staticmethod
+    def _get_snapshot_id(list_id: str, state: str, token: str) -> str:
+        return f"{list_id}#{state}#{token}"
+
+    @staticmethod
+    def get_token(item_versions: dict[str, int]) -> str:
+        encoded = json.dumps(sorted(item_versions.items()), separators=(",", ":")).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()[:32]
+
+    def get(self, list_id: str, state: str, token: str, refresh: bool = False) -> Optional[dict[str, int]]:
+        """
+        Get the item versions recorded for a token, or None if the snapshot doesn't exist or has expired.
+        If `refresh` is set, the snapshot's expiration is extended, at most once per refresh interval
+        """
+
+        item = self.db.get("snapshot_id", self._get_snapshot_id(list_id, state, token))
+        if not item:
+            return None
+
+        snapshot = ListSnapshot.parse_obj(item)
+        if refresh and (snapshot.expires or 0) < time.time() + self.expiration - SNAPSHOT_REFRESH_INTERVAL:
+            self.db.put(item, self.expiration)
+
+        return snapshot.versions
+
+    def put(self, list_id: str, state: str, item_versions: dict[str, int]) -> str:
+        """Record a list's item versions, returning the token for them"""
+
+        token = self.get_token(item_versions)
+        snapshot = ListSnapshot.from_versions(self._get_snapshot_id(list_id, state, token), item_versions)
+        self.db.put(snapshot.dict(exclude_none=True), self.expiration)
+        return token
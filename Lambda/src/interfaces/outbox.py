@@ -0,0 +1,94 @@
+import hashlib
+from typing import Any, Iterator
+
+from ..models.dynamodb import OutboxEvent, OutboxEventStatus
+from ..models.shopping_list_api import ShoppingListAPIListEvent
+from ..skill import get_aws_client
+from .dynamodb import DynamoDB
+
+PENDING_EXPIRATION = 60 * 60
+"""account linking tokens expire after an hour, so undelivered events are useless after that"""
+
+DELIVERED_EXPIRATION = 60 * 60 * 24
+"""how long delivered and failed events are kept for troubleshooting"""
+
+STATUS_INDEX_NAME = "delivery_status-index"
+"""GSI partitioned by `delivery_status` (projecting all attributes), so pending events are queried rather than scanned"""
+
+
+class ListEventOutbox:
+    """
+    DynamoDB-backed outbox of list events waiting to be delivered to the Unified Shopping List API.
+    Access tokens are encrypted with a KMS key before they're written, bound to their event's request id
+    """
+
+    def __init__(self, tablename: str, key_id: str, max_attempts: int = 5) -> None:
+        if not key_id:
+            raise ValueError("the list event outbox requires a KMS key to encrypt access tokens")
+
+        self.db = DynamoDB(tablename)
+        self.key_id = key_id
+        self.max_attempts = max_attempts
+
+    @property
+    def kms(self) -> Any:
+        return get_aws_client("kms")
+
+    def enqueue(self, auth_token: str, list_event: ShoppingListAPIListEvent) -> None:
+        """Write a list event to the outbox so it can be delivered later"""
+
+        encrypted = self.kms.encrypt(
+            KeyId=self.key_id,
+            Plaintext=auth_token.encode("utf-8"),
+            EncryptionContext={"request_id": list_event.request_id},
+        )
+
+        outbox_event = OutboxEvent(
+            request_id=list_event.request_id,
+            auth_token_hash=hashlib.sha256(auth_token.encode("utf-8")).hexdigest(),
+            auth_token_encrypted=encrypted["CiphertextBlob"],
+            list_event=list_event.json(),
+        )
+        self.db.put(outbox_event.dict(exclude_none=True), PENDING_EXPIRATION)
+
+    def get_auth_token(self, outbox_event: OutboxEvent) -> str:
+        decrypted = self.kms.decrypt(
+            KeyId=self.key_id,
+            CiphertextBlob=outbox_event.auth_token_encrypted,
+            EncryptionContext={"request_id": outbox_event.request_id},
+        )
+
+        return decrypted["Plaintext"].decode("utf-8")
+
+    def get_pending(self) -> Iterator[OutboxEvent]:
+        """Yield every event which hasn't been delivered yet"""
+
+        items = self.db.query(
+            "#status = :pending",
+            IndexName=STATUS_INDEX_NAME,
+            ExpressionAttributeNames={"#status": "delivery_status"},
+            ExpressionAttributeValues={":pending": {"S": OutboxEventStatus.pending.value}},
+        )
+
+        for item in items:
+            yield OutboxEvent.parse_obj(item)
+
+    def mark_done(self, outbox_events: list[OutboxEvent]) -> None:
+        for outbox_event in outbox_events:
+            outbox_event.delivery_status = OutboxEventStatus.done.value  # type: ignore
+
+        self.db.batch_put(
+            (outbox_event.dict(exclude_none=True) for outbox_event in outbox_events), DELIVERED_EXPIRATION
+        )
+
+    def mark_attempted(self, outbox_event: OutboxEvent) -> None:
+        """Record a failed delivery attempt, giving up on the event once it runs out of attempts"""
+
+        outbox_event.attempts += 1
+        if outbox_event.attempts < self.max_attempts:
+            # keep the original expiration so the event doesn't outlive its access token
+            self.db.put(outbox_event.dict(exclude_none=True))
+            return
+
+        outbox_event.delivery_status = OutboxEventStatus.failed.value  # type: ignore
+        self.db.put(outbox_event.dict(exclude_none=True), DELIVERED_EXPIRATION)
@@ -1,15 +1,123 @@
 import json
-from typing import Any
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Optional
 
-from ..skill import aws_session
+from ..skill import get_aws_client
 
-secrets = aws_session.client("secretsmanager")
+SECRETS_CACHE_TTL = float(os.getenv("secretsCacheTTL", "300"))
+SECRETS_REFRESH_AHEAD = float(os.getenv("secretsRefreshAhead", "60"))
+"""how many seconds before a cached secret expires to start refreshing it in the background"""
+
+SECRETS_RETRY_INTERVAL = 10
+"""how long to wait before trying again after a background refresh fails"""
+
+
+class _CachedSecret:
+    def __init__(self, value: dict[str, Any], ttl: float, refresh_ahead: float) -> None:
+        now = time.monotonic()
+        self.value = value
+        self.expires_at = now + ttl
+        self.refresh_at = now + max(0, ttl - refresh_ahead)
+
+
+class SecretsCache:
+    """
+    Per-container cache of secrets. Secrets are refreshed in the background shortly
+    before they expire, the last known value is served if a refresh fails, and
+    concurrent requests for the same secret share a single fetch
+    """
+
+    def __init__(self, ttl: float = SECRETS_CACHE_TTL, refresh_ahead: float = SECRETS_REFRESH_AHEAD) -> None:
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+
+        self._secrets: dict[str, _CachedSecret] = {}
+        self._in_flight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _fetch(self, secret_id: str) -> dict[str, Any]:
+        """Fetch a secret, joining the fetch already in flight for it if there is one"""
+
+        future: Future = Future()
+        with self._lock:
+            in_flight = self._in_flight.setdefault(secret_id, future)
+
+        if in_flight is not future:
+            return in_flight.result()
+
+        try:
+            response = get_aws_client("secretsmanager").get_secret_value(SecretId=secret_id)
+            value = json.loads(response["SecretString"])
+            with self._lock:
+                self._secrets[secret_id] = _CachedSecret(value, self.ttl, self.refresh_ahead)
+
+            future.set_result(value)
+            return value
+
+        except Exception as e:
+            future.set_exception(e)
+            raise
+
+        finally:
+            with self._lock:
+                self._in_flight.pop(secret_id, None)
+
+    def _refresh(self, secret_id: str) -> None:
+        try:
+            self._fetch(secret_id)
+
+        except Exception as e:
+            logging.info(f"unable to refresh secret {secret_id}; serving the cached value. {type(e).__name__}: {e}")
+            with self._lock:
+                cached = self._secrets.get(secret_id)
+                if cached:
+                    cached.refresh_at = time.monotonic() + SECRETS_RETRY_INTERVAL
+
+    def get(self, secret_id: str) -> dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._secrets.get(secret_id)
+            refresh = bool(cached and cached.refresh_at <= now < cached.expires_at)
+            if refresh:
+                assert cached
+                # don't start another refresh until this one has had a chance to finish
+                cached.refresh_at = now + SECRETS_RETRY_INTERVAL
+
+        if cached and now < cached.expires_at:
+            if refresh:
+                threading.Thread(target=self._refresh, args=(secret_id,), daemon=True).start()
+
+            return cached.value
+
+        try:
+            return self._fetch(secret_id)
+
+        except Exception as e:
+            if not cached:
+                raise
+
+            logging.info(f"unable to fetch secret {secret_id}; serving the expired value. {type(e).__name__}: {e}")
+            return cached.value
+
+    def invalidate(self, secret_id: Optional[str] = None) -> None:
+        with self._lock:
+            if secret_id:
+                self._secrets.pop(secret_id, None)
+
+            else:
+                self._secrets.clear()
+
+
+secrets_cache = SecretsCache()
 
 
 class SecretsManager:
     @staticmethod
     def get_secrets(secret_id: str) -> dict[str, Any]:
-        """Fetches secrets from AWS secrets manager"""
+        """Fetches secrets from AWS secrets manager, using the per-container cache"""
 
-        response = secrets.get_secret_value(SecretId=secret_id)
-        return json.loads(response["SecretString"])
+        return secrets_cache.get(secret_id)
@@ -1,32 +1,210 @@
+import base64
+import gzip
+import hashlib
+import hmac
+import json
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Optional
+
 from requests import HTTPError
 
 from ..clients.shopping_list_api import ShoppingListAPIClient
 from ..config import (
+    API_APP_CLIENT_ID,
+    API_APP_CLIENT_SECRET,
+    SHOPPING_LIST_API_LINK_ACCOUNT_ROUTE,
     SHOPPING_LIST_API_POST_ITEM_EVENTS_ROUTE,
+    SHOPPING_LIST_API_UNLINK_ACCOUNT_ROUTE,
     SHOPPING_LIST_API_VALIDATION_ROUTE,
 )
 from ..models.shopping_list_api import ShoppingListAPIListEvent
+from ..skill import USL_POST_ITEM_EVENTS_BATCH_ROUTE, USL_TOKEN_INVALID_TTL, USL_TOKEN_VALID_TTL
+from .token_validity import TokenValidityCache, is_auth_failure
+
+GZIP_MIN_BYTES = 8 * 1024
+"""batch payloads smaller than this are not worth compressing"""
+
+token_validity = TokenValidityCache(USL_TOKEN_VALID_TTL, USL_TOKEN_INVALID_TTL)
+
+
+def _as_utc(timestamp: datetime) -> datetime:
+    """Make a timestamp comparable with any other; naive timestamps are assumed to be UTC"""
+
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=timezone.utc)
+
+    return timestamp.astimezone(timezone.utc)
+
+
+def coalesce_list_events(list_events: list[ShoppingListAPIListEvent], window: float) -> list[ShoppingListAPIListEvent]:
+    """
+    Merge consecutive events for the same list and operation which fall within `window` seconds
+    of the first event merged. An event for the same list with a different operation ends the
+    merge, so a list's operations are never reordered. Merged events keep the first event's
+    request id, the latest timestamp, and every list item id in the order they were received
+    """
+
+    return [list_event for list_event, _ in coalesce_list_events_with_sources(list_events, window)]
+
+
+def coalesce_list_events_with_sources(
+    list_events: list[ShoppingListAPIListEvent], window: float
+) -> list[tuple[ShoppingListAPIListEvent, list[str]]]:
+    """Coalesce list events like `coalesce_list_events`, pairing each with the request ids of the events merged into it"""
+
+    coalesced: list[tuple[ShoppingListAPIListEvent, list[str]]] = []
+    open_events: dict[tuple[str, str], tuple[ShoppingListAPIListEvent, datetime, list[str]]] = {}
+    for list_event in sorted(list_events, key=lambda e: _as_utc(e.timestamp)):
+        group = (list_event.list_id, str(list_event.object_type))
+        open_event = open_events.get(group)
+
+        if open_event:
+            (merged, anchor, sources) = open_event
+            elapsed = (_as_utc(list_event.timestamp) - anchor).total_seconds()
+            if merged.operation == list_event.operation and elapsed <= window:
+                item_ids = merged.list_item_ids or []
+                item_ids.extend(id for id in list_event.list_item_ids or [] if id not in item_ids)
+                merged.list_item_ids = item_ids
+                merged.timestamp = list_event.timestamp
+                sources.append(list_event.request_id)
+
+                # later reads of an item replace earlier ones; events are only hydrated if all of their items are
+                if merged.list_items is None or list_event.list_items is None:
+                    merged.list_items = None
+
+                else:
+                    items = {item.id: item for item in merged.list_items + list_event.list_items}
+                    merged.list_items = list(items.values())
+
+                continue
+
+        merged = list_event.copy(deep=True)
+        sources = [list_event.request_id]
+        open_events[group] = (merged, _as_utc(list_event.timestamp), sources)
+        coalesced.append((merged, sources))
+
+    return coalesced
+
+
+@lru_cache(maxsize=1)
+def get_security_hash() -> str:
+    """
+    The hash the Unified Shopping List API uses to verify requests made without a user's token.
+    It only depends on the app credentials, so it's computed once per container
+    """
+
+    hmac_signature = hmac.new(
+        key=API_APP_CLIENT_SECRET.encode("utf-8"),
+        msg=API_APP_CLIENT_ID.encode("utf-8"),
+        digestmod=hashlib.sha256,
+    )
+
+    return base64.b64encode(hmac_signature.digest()).decode()
 
 
 class ShoppingListAPIInterface:
-    def __init__(self, base_url: str, auth_token: str) -> None:
-        self._client = ShoppingListAPIClient(base_url, auth_token)
+    def __init__(
+        self, base_url: str, auth_token: Optional[str] = None, deadline: Optional[float] = None, timeout: int = 30
+    ) -> None:
+        self._client = ShoppingListAPIClient(base_url, auth_token, timeout=timeout, deadline=deadline)
+        self._auth_token = auth_token
+
+    @staticmethod
+    def _serialize_list_event(list_event: ShoppingListAPIListEvent) -> dict[str, Any]:
+        list_event_payload = list_event.dict()
+        list_event_payload["timestamp"] = list_event_payload["timestamp"].isoformat()
+        return list_event_payload
+
+    def _record_token_validity(self, error: Optional[HTTPError] = None) -> None:
+        """Remember whether USL accepted the token; errors other than auth failures say nothing about the token"""
+
+        if not self._auth_token:
+            return
+
+        if error is None:
+            token_validity.set(self._auth_token, True)
+
+        elif is_auth_failure(error):
+            token_validity.set(self._auth_token, False)
+
+    def _post_list_item_events(self, endpoint: str, **kwargs: Any) -> None:
+        try:
+            self._client.post(endpoint, **kwargs)
+
+        except HTTPError as e:
+            self._record_token_validity(e)
+            raise
+
+        self._record_token_validity()
 
     @property
     def is_valid(self) -> bool:
-        """Call the Unified Shopping List API and check if the configuration is valid"""
+        """
+        Call the Unified Shopping List API and check if the configuration is valid.
+        Tokens which were checked recently aren't checked again
+        """
+
+        cached = token_validity.get(self._auth_token) if self._auth_token else None
+        if cached is not None:
+            return cached
 
         try:
             self._client.get(SHOPPING_LIST_API_VALIDATION_ROUTE)
-            return True
 
-        except HTTPError:
+        except HTTPError as e:
+            self._record_token_validity(e)
             return False
 
+        self._record_token_validity()
+        return True
+
+    def link_account(self, user_id: str) -> None:
+        """Link an Alexa user to the Unified Shopping List user whose token this interface was built with"""
+
+        self._client.post(SHOPPING_LIST_API_LINK_ACCOUNT_ROUTE, params={"userId": user_id})
+
+    def unlink_account(self, user_id: str) -> None:
+        """Unlink an Alexa user from the Unified Shopping List; this doesn't need a user token"""
+
+        self._client.delete(
+            SHOPPING_LIST_API_UNLINK_ACCOUNT_ROUTE,
+            headers={"X-Alexa-Security-Hash": get_security_hash()},
+            params={"userId": user_id},
+        )
+
     def post_list_item_event(self, list_event: ShoppingListAPIListEvent) -> None:
         """Post a list item event to the Unified Shopping List API"""
 
-        list_event_payload = list_event.dict()
-        list_event_payload["timestamp"] = list_event_payload["timestamp"].isoformat()
+        self._post_list_item_events(
+            SHOPPING_LIST_API_POST_ITEM_EVENTS_ROUTE, payload=self._serialize_list_event(list_event)
+        )
+
+    def post_list_item_events(self, list_events: list[ShoppingListAPIListEvent], compress: bool = True) -> None:
+        """
+        Post multiple list item events to the Unified Shopping List API. If USL's batch route is configured
+        they're sent in a single request, which is gzipped when it's large unless `compress` is disabled;
+        otherwise each event is posted on its own
+        """
+
+        if not list_events:
+            return
+
+        if len(list_events) == 1 or not USL_POST_ITEM_EVENTS_BATCH_ROUTE:
+            for list_event in list_events:
+                self.post_list_item_event(list_event)
+
+            return
+
+        payload = {"events": [self._serialize_list_event(list_event) for list_event in list_events]}
+        body = json.dumps(payload).encode("utf-8")
+
+        if not compress or len(body) < GZIP_MIN_BYTES:
+            self._post_list_item_events(USL_POST_ITEM_EVENTS_BATCH_ROUTE, data=body)
+            return
 
-        self._client.post(SHOPPING_LIST_API_POST_ITEM_EVENTS_ROUTE, payload=list_event_payload)
+        self._post_list_item_events(
+            USL_POST_ITEM_EVENTS_BATCH_ROUTE,
+            data=gzip.compress(body),
+            headers={"content-encoding": "gzip"},
+        )
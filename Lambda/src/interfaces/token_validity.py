@@ -0,0 +1,53 @@
+import hashlib
+from typing import Optional
+
+from requests import HTTPError
+
+from ..utils.cache import TTLCache
+
+AUTH_FAILURE_STATUS_CODES = frozenset([401, 403])
+
+
+def is_auth_failure(error: HTTPError) -> bool:
+    return error.response is not None and error.response.status_code in AUTH_FAILURE_STATUS_CODES
+
+
+class TokenValidityCache:
+    """
+    Per-container record of whether the Unified Shopping List API accepted or rejected an access token.
+    Tokens are keyed by their hash so raw tokens aren't held in memory. Rejections are remembered for
+    longer than acceptances, so unlinked users don't cost a request to USL on every list change
+    """
+
+    def __init__(self, valid_ttl: float, invalid_ttl: float, max_size: int = 1024) -> None:
+        self.cache: TTLCache[bool] = TTLCache(valid_ttl, max_size)
+        self.invalid_ttl = invalid_ttl
+
+        self._user_tokens: TTLCache[str] = TTLCache(max(valid_ttl, invalid_ttl), max_size)
+        """the most recent token hash seen for each user, so a user's entry can be invalidated without their token"""
+
+    @staticmethod
+    def get_key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[bool]:
+        """Whether the token was recently valid, or None if it hasn't been checked recently"""
+
+        return self.cache.get(self.get_key(token))
+
+    def set(self, token: str, valid: bool) -> None:
+        self.cache.set(self.get_key(token), valid, ttl=None if valid else self.invalid_ttl)
+
+    def track_user(self, user_id: str, token: str) -> None:
+        self._user_tokens.set(user_id, self.get_key(token))
+
+    def invalidate(self, token: str) -> None:
+        self.cache.invalidate(self.get_key(token))
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Forget the validity of the last token seen for a user, e.g. when they link or unlink their account"""
+
+        key = self._user_tokens.get(user_id)
+        if key:
+            self.cache.invalidate(key)
+            self._user_tokens.invalidate(user_id)
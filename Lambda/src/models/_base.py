@@ -1,4 +1,4 @@
-from typing import TypeVar
+from typing import Any, NamedTuple, TypeVar
 
 from humps.main import camelize
 from pydantic import BaseModel
@@ -6,6 +6,83 @@ from pydantic import BaseModel
 T = TypeVar("T", bound=BaseModel)
 
 
+class FieldPlan(NamedTuple):
+    fields: tuple[str, ...]
+    """fields present on both models, in source field order"""
+
+    trusted: bool
+    """whether values from the source can be copied to the destination without validation"""
+
+    complete: bool
+    """whether the shared fields include every field the destination requires"""
+
+
+_field_plans: dict[tuple[type[BaseModel], type[BaseModel]], FieldPlan] = {}
+
+
+def _has_validators(cls: type[BaseModel]) -> bool:
+    return bool(cls.__validators__ or cls.__pre_root_validators__ or cls.__post_root_validators__)
+
+
+def _is_trusted(src: type[BaseModel], dest: type[BaseModel], fields: tuple[str, ...]) -> bool:
+    """
+    Values from a validated source are valid for the destination if each shared field has the
+    same type, the destination won't run custom validators, and enums are stored the same way
+    """
+
+    if _has_validators(dest) or dest.__config__.validate_assignment:
+        return False
+
+    if dest.__config__.frozen or not dest.__config__.allow_mutation:
+        return False
+
+    if src.__config__.use_enum_values != dest.__config__.use_enum_values:
+        return False
+
+    for field in fields:
+        src_field = src.__fields__[field]
+        dest_field = dest.__fields__[field]
+        if src_field.outer_type_ != dest_field.outer_type_ or src_field.shape != dest_field.shape:
+            return False
+
+        if src_field.allow_none and not dest_field.allow_none:
+            return False
+
+    return True
+
+
+def get_field_plan(src: type[BaseModel], dest: type[BaseModel]) -> FieldPlan:
+    """Get the fields shared by two models, computing them the first time a pair of models is mapped"""
+
+    plan = _field_plans.get((src, dest))
+    if plan:
+        return plan
+
+    fields = tuple(field for field in src.__fields__ if field in dest.__fields__)
+    complete = all(field in fields for field, model_field in dest.__fields__.items() if model_field.required)
+    plan = FieldPlan(fields, _is_trusted(src, dest, fields), complete)
+    _field_plans[(src, dest)] = plan
+    return plan
+
+
+def _copy_fields(src: BaseModel, dest: BaseModel, plan: FieldPlan, replace_null: bool = True) -> None:
+    values: dict[str, Any] = src.__dict__
+    if not replace_null:
+        fields = tuple(field for field in plan.fields if values[field] is not None)
+
+    else:
+        fields = plan.fields
+
+    if not plan.trusted:
+        for field in fields:
+            setattr(dest, field, values[field])
+
+        return
+
+    dest.__dict__.update({field: values[field] for field in fields})
+    dest.__fields_set__.update(fields)
+
+
 class AlexaBase(BaseModel):
     class Config:
         alias_generator = camelize
@@ -15,12 +92,18 @@ class AlexaBase(BaseModel):
         """
         Cast the current model to another with additional arguments. Useful for
         transforming DTOs into models that are saved to a database
+
+        If no additional arguments are provided and the models' shared fields are compatible,
+        the new model is built without re-validating values; like `map_to`, mutable values
+        are shared with the current model rather than copied
         """
-        create_data = {
-            field: getattr(self, field)
-            for field in self.__fields__
-            if field in cls.__fields__
-        }
+
+        plan = get_field_plan(type(self), cls)
+        values = self.__dict__
+        create_data = {field: values[field] for field in plan.fields}
+        if plan.trusted and plan.complete and not kwargs:
+            return cls.construct(**create_data)
+
         create_data.update(kwargs or {})
         return cls(**create_data)
 
@@ -30,10 +113,7 @@ class AlexaBase(BaseModel):
         for method chaining.
         """
 
-        for field in self.__fields__:
-            if field in dest.__fields__:
-                setattr(dest, field, getattr(self, field))
-
+        _copy_fields(self, dest, get_field_plan(type(self), type(dest)))
         return dest
 
     def map_from(self, src: BaseModel):
@@ -41,16 +121,11 @@ class AlexaBase(BaseModel):
         Map matching values from another model to the current model.
         """
 
-        for field in src.__fields__:
-            if field in self.__fields__:
-                setattr(self, field, getattr(src, field))
+        _copy_fields(src, self, get_field_plan(type(src), type(self)))
 
     def merge(self, src: T, replace_null=False):
         """
         Replace matching values from another instance to the current instance.
         """
 
-        for field in src.__fields__:
-            val = getattr(src, field)
-            if field in self.__fields__ and (val is not None or replace_null):
-                setattr(self, field, val)
+        _copy_fields(src, self, get_field_plan(type(src), type(self)), replace_null)
@@ -1,7 +1,145 @@
+import json
+import zlib
+from enum import Enum
+from typing import Any, Optional
+
 from pydantic import BaseModel
 
+CALLBACK_COMPRESSION_MIN_BYTES = 4 * 1024
+"""bodies smaller than this are stored as plain text"""
+CALLBACK_COMPRESSION_BUFFER_BYTES = 64 * 1024
+"""how much serialized JSON is buffered before it's passed to the compressor"""
+
+
+class CallbackEventCodec(Enum):
+    zlib = "zlib"
+
 
 class CallbackEvent(BaseModel):
     event_source: str
     event_id: str
-    data: str
+
+    data: Optional[str] = None
+    """uncompressed response body, only used for small bodies"""
+
+    data_compressed: Optional[bytes] = None
+    data_codec: Optional[CallbackEventCodec] = None
+    data_codec_version: Optional[int] = None
+
+    chunk_count: Optional[int] = None
+    """only set on streamed responses, whose results are written as separate chunks keyed `{event_id}/{n}`"""
+    complete: Optional[bool] = None
+    """only set on streamed responses; False until every chunk has been written"""
+
+    class Config:
+        use_enum_values = True
+
+    @classmethod
+    def from_body(cls, event_source: str, event_id: str, body: str) -> "CallbackEvent":
+        """Build a callback event, compressing the body if it's large"""
+
+        encoded = body.encode("utf-8")
+        if len(encoded) < CALLBACK_COMPRESSION_MIN_BYTES:
+            return cls(event_source=event_source, event_id=event_id, data=body)
+
+        return cls(
+            event_source=event_source,
+            event_id=event_id,
+            data_compressed=zlib.compress(encoded),
+            data_codec=CallbackEventCodec.zlib,
+            data_codec_version=1,
+        )
+
+    @classmethod
+    def from_data(cls, event_source: str, event_id: str, data: Any) -> "CallbackEvent":
+        """
+        Build a callback event from a JSON-serializable body, the same as `from_body(..., json.dumps(data))`.
+        Large bodies are compressed as they're serialized, so the full JSON is never held in memory
+        """
+
+        compressor = zlib.compressobj()
+        compressed: list[bytes] = []
+        buffer: list[str] = []
+        buffered = 0
+        for fragment in json.JSONEncoder().iterencode(data):
+            buffer.append(fragment)
+            buffered += len(fragment)
+            if buffered >= CALLBACK_COMPRESSION_BUFFER_BYTES:
+                compressed.append(compressor.compress("".join(buffer).encode("utf-8")))
+                buffer.clear()
+                buffered = 0
+
+        if not compressed:
+            return cls.from_body(event_source, event_id, "".join(buffer))
+
+        compressed.append(compressor.compress("".join(buffer).encode("utf-8")))
+        compressed.append(compressor.flush())
+        return cls(
+            event_source=event_source,
+            event_id=event_id,
+            data_compressed=b"".join(compressed),
+            data_codec=CallbackEventCodec.zlib,
+            data_codec_version=1,
+        )
+
+    @property
+    def body(self) -> str:
+        if self.data is not None:
+            return self.data
+
+        if self.data_compressed is None:
+            raise ValueError("callback event has no body")
+
+        if self.data_codec != CallbackEventCodec.zlib.value or self.data_codec_version != 1:
+            raise ValueError(f"unsupported callback event codec {self.data_codec} v{self.data_codec_version}")
+
+        return zlib.decompress(self.data_compressed).decode("utf-8")
+
+
+class OutboxEventStatus(Enum):
+    pending = "pending"
+    done = "done"
+    failed = "failed"
+
+
+class OutboxEvent(BaseModel):
+    request_id: str
+    auth_token_hash: str
+    """SHA-256 of the user's access token, so a user's events can be grouped without decrypting their tokens"""
+
+    auth_token_encrypted: bytes
+    """the user's access token, encrypted with the outbox's KMS key"""
+
+    list_event: str
+    """JSON-serialized ShoppingListAPIListEvent"""
+
+    delivery_status: OutboxEventStatus = OutboxEventStatus.pending
+    attempts: int = 0
+    expires: Optional[int] = None
+
+    class Config:
+        use_enum_values = True
+
+
+class ProcessedListEvent(BaseModel):
+    request_id: str
+    expires: Optional[int] = None
+
+
+class ListSnapshot(BaseModel):
+    snapshot_id: str
+    """`{list id}#{list state}#{snapshot token}`"""
+
+    item_versions: bytes
+    """zlib-compressed JSON of [item id, item version] pairs"""
+
+    expires: Optional[int] = None
+
+    @classmethod
+    def from_versions(cls, snapshot_id: str, item_versions: dict[str, int]) -> "ListSnapshot":
+        encoded = json.dumps(sorted(item_versions.items()), separators=(",", ":")).encode("utf-8")
+        return cls(snapshot_id=snapshot_id, item_versions=zlib.compress(encoded))
+
+    @property
+    def versions(self) -> dict[str, int]:
+        return {item_id: version for item_id, version in json.loads(zlib.decompress(self.item_versions))}
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Any, Optional
 
 from ask_sdk_model.services.list_management.create_list_item_request import (
     CreateListItemRequest,
@@ -20,6 +20,31 @@ class ReadList(AlexaBase):
     state: ListState = ListState.active
 
 
+class ReadListDelta(AlexaBase):
+    list_id: str
+    state: ListState = ListState.active
+    snapshot_token: Optional[str] = None
+    """token from a previous delta read; if it's missing or has expired, every item is returned"""
+
+
+class ListDelta(AlexaBase):
+    list_id: str
+    snapshot_token: str
+    """pass this to the next delta read to get the changes since this one"""
+
+    full_sync: bool
+    """whether every item was returned because there was no usable previous snapshot"""
+
+    added: list[dict[str, Any]] = []
+    updated: list[dict[str, Any]] = []
+    removed: list[str] = []
+
+    def to_dict(self) -> dict[str, Any]:
+        """Matches the Alexa list models, which are serialized with snake_case keys"""
+
+        return self.dict()
+
+
 class CreateList(AlexaBase):
     name: str
     state: ListState = ListState.active
@@ -71,3 +96,52 @@ class UpdateListItem(AlexaBase):
 class DeleteListItem(AlexaBase):
     list_id: str
     item_id: str
+
+
+### Bulk List Items ###
+class BulkCreateListItem(AlexaBase):
+    value: str
+    status: ListItemState = ListItemState.active
+
+
+class BulkUpdateListItem(AlexaBase):
+    item_id: str
+    value: str
+    status: ListItemState = ListItemState.active
+    version: int
+
+
+class BulkDeleteListItem(AlexaBase):
+    item_id: str
+
+
+class BulkCreateListItems(AlexaBase):
+    list_id: str
+    items: list[BulkCreateListItem]
+
+
+class BulkUpdateListItems(AlexaBase):
+    list_id: str
+    items: list[BulkUpdateListItem]
+
+
+class BulkDeleteListItems(AlexaBase):
+    list_id: str
+    items: list[BulkDeleteListItem]
+
+
+class BulkListItemResult(AlexaBase):
+    id: Optional[str] = None
+    version: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BulkListItemsResult(AlexaBase):
+    list_id: str
+    results: list[BulkListItemResult]
+    """one result per requested item, in the same order"""
+
+    failed: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return self.dict(exclude_none=True)
@@ -8,8 +8,12 @@ class Operation(Enum):
     create = "create"
     read = "read"
     read_all = "read_all"
+    read_delta = "read_delta"
     update = "update"
     delete = "delete"
+    bulk_create = "bulk_create"
+    bulk_update = "bulk_update"
+    bulk_delete = "bulk_delete"
 
 
 class ObjectType(Enum):
@@ -32,6 +36,13 @@ class Message(BaseModel):
 
     metadata: Optional[dict[str, Any]]
     send_callback_response: Optional[bool]
+    stream_callback_response: Optional[bool]
+    """write each request's response to the callback table as it completes, rather than all at once"""
+
+
+class ReceivedMessage(Message):
+    requests: list[dict[str, Any]]  # type: ignore[assignment]
+    """validated one at a time as they're processed, so one invalid request doesn't fail the whole message"""
 
 
 class MessageResponseBody(BaseModel):
@@ -32,5 +32,8 @@ class ShoppingListAPIListEvent(AlexaBase):
     list_item_ids: Optional[list[str]] = []
     """only populated in list item events"""
 
+    list_items: Optional[list[ShoppingListAPIListItem]] = None
+    """the items in `list_item_ids`; only populated if list events are hydrated and the items could be read"""
+
     class Config:
         use_enum_values = True
@@ -1,12 +1,26 @@
 import logging
 import os
 import sys
+import threading
+from typing import TYPE_CHECKING, Any, Optional
 
 from ask_sdk_core.api_client import DefaultApiClient
-from ask_sdk_core.skill_builder import CustomSkillBuilder
-from boto3.session import Session
 
 from .config import AWS_REGION
+from .utils.dispatch import IndexedSkillBuilder
+from .utils.metrics import (
+    METRICS_ENABLED,
+    MetricsRequestInterceptor,
+    MetricsResponseInterceptor,
+)
+from .utils.profiling import (
+    MEMORY_PROFILING_ENABLED,
+    MemoryProfilingRequestInterceptor,
+    MemoryProfilingResponseInterceptor,
+)
+
+if TYPE_CHECKING:
+    from boto3.session import Session
 
 # we need this to get ask_local_debug to work
 dir_path = os.path.dirname(os.path.realpath(__file__))
@@ -15,7 +29,87 @@ sys.path.append(os.path.abspath(os.path.join(dir_path, os.pardir)))
 logging.getLogger().setLevel(logging.INFO)
 
 USL_BASE_URL = os.getenv("apiBaseUrl", "")
-aws_session = Session(region_name=AWS_REGION)
+USL_ACCOUNT_TIMEOUT = int(os.getenv("apiAccountTimeout", "10"))
+"""seconds each attempt to link or unlink a user's account may take"""
+USL_POST_ITEM_EVENTS_BATCH_ROUTE = os.getenv("apiPostItemEventsBatchRoute", "")
+"""USL route which accepts several list events in one request; when unset, queued events are posted one at a time"""
+USL_TOKEN_VALID_TTL = float(os.getenv("apiTokenValidTTL", "60"))
+"""how many seconds a token USL accepted is remembered as valid"""
+USL_TOKEN_INVALID_TTL = float(os.getenv("apiTokenInvalidTTL", "900"))
+"""how many seconds a token USL rejected is remembered; list events for the token are dropped in the meantime"""
+MESSAGE_CONCURRENCY = int(os.getenv("messageConcurrency", "1"))
+"""how many message requests may be sent to Alexa at once; 1 processes them sequentially"""
+LIST_EVENT_COALESCE_WINDOW = float(os.getenv("listEventCoalesceWindow", "5"))
+"""queued list events for the same list and operation within this many seconds are sent to USL as one event"""
+LIST_EVENT_OUTBOX_TABLENAME = os.getenv("listEventOutboxTableName", "")
+"""when set, list events are queued in this table and delivered by `outbox_handler` rather than inline"""
+LIST_EVENT_OUTBOX_KEY_ID = os.getenv("listEventOutboxKeyId", "")
+"""KMS key which encrypts the access tokens held in the outbox; required when the outbox is enabled"""
+LIST_EVENT_OUTBOX_FALLBACK_ONLY = os.getenv("listEventOutboxMode", "always") == "fallback"
+"""only queue list events in the outbox while USL is unavailable, rather than queueing all of them"""
+LIST_EVENT_DEDUP_TABLENAME = os.getenv("listEventDedupTableName", "")
+"""when set, processed list event ids are recorded in this table so redelivered events are caught across containers"""
+LIST_EVENT_DEDUP_TTL = int(os.getenv("listEventDedupTTL", "3600"))
+"""how many seconds a list event is remembered after it's processed"""
+LIST_EVENT_HYDRATE_ITEMS = os.getenv("listEventHydrateItems", "false").lower() == "true"
+"""include the created and updated items in list events, so USL doesn't have to send a message to read them"""
+LIST_EVENT_HYDRATE_READ_LIST_MIN_ITEMS = int(os.getenv("listEventHydrateReadListMinItems", "5"))
+"""events with at least this many items read the whole list once, rather than reading each item"""
+LIST_BULK_CONCURRENCY = int(os.getenv("listBulkConcurrency", "8"))
+"""how many items in a bulk request may be written to Alexa at once"""
+LIST_SNAPSHOT_TABLENAME = os.getenv("listSnapshotTableName", "")
+"""table of list snapshots used by read_delta requests; read_delta is unavailable if this isn't set"""
+LIST_CACHE_TTL = float(os.getenv("listCacheTTL", "0"))
+"""how many seconds Alexa list reads are cached per user; 0 disables the cache"""
+LIST_CACHE_MAX_SIZE = int(os.getenv("listCacheMaxSize", "256"))
+
+_aws_session: Optional["Session"] = None
+_aws_clients: dict[str, Any] = {}
+_aws_lock = threading.Lock()
+
+
+def get_aws_client(service_name: str, **kwargs: Any) -> Any:
+    """
+    Get a boto3 client, creating it on first use. boto3 is slow to import and its clients
+    are slow to build, so this keeps that cost off invocations which never use AWS services.
+    Keyword arguments are only used when the client is first created
+    """
+
+    client = _aws_clients.get(service_name)
+    if client:
+        return client
+
+    global _aws_session
+    with _aws_lock:
+        if service_name not in _aws_clients:
+            if not _aws_session:
+                from boto3.session import Session
+
+                _aws_session = Session(region_name=AWS_REGION)
+
+            _aws_clients[service_name] = _aws_session.client(service_name, **kwargs)
+
+        return _aws_clients[service_name]
+
+
+sb = IndexedSkillBuilder(api_client=DefaultApiClient())
+if METRICS_ENABLED:
+    sb.add_global_request_interceptor(MetricsRequestInterceptor())
+    sb.add_global_response_interceptor(MetricsResponseInterceptor())
+
+if MEMORY_PROFILING_ENABLED:
+    sb.add_global_request_interceptor(MemoryProfilingRequestInterceptor())
+    sb.add_global_response_interceptor(MemoryProfilingResponseInterceptor())
+
+# handler modules register their handlers on `sb` when they're imported, so build the skill once they all are
+from . import handlers  # noqa: E402, F401
 
-sb = CustomSkillBuilder(api_client=DefaultApiClient())
 handler = sb.lambda_handler()
+
+
+def outbox_handler(event: dict[str, Any], context: Any) -> dict[str, int]:
+    """Entry point for the scheduled function which delivers queued list events to USL"""
+
+    from .handlers.outbox import drain_outbox
+
+    return drain_outbox(context)
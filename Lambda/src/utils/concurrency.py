@@ -0,0 +1,66 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Hashable, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+def _plan_stages(keys: Sequence[Optional[Hashable]]) -> list[list[list[int]]]:
+    """
+    Group task indexes into stages of independent chains. Tasks sharing a key are put
+    in the same chain, and a task without a key ends the current stage and gets a stage
+    to itself
+    """
+
+    stages: list[list[list[int]]] = []
+    chains: dict[Hashable, list[int]] = {}
+    for i, key in enumerate(keys):
+        if key is None:
+            if chains:
+                stages.append(list(chains.values()))
+                chains = {}
+
+            stages.append([[i]])
+            continue
+
+        chains.setdefault(key, []).append(i)
+
+    if chains:
+        stages.append(list(chains.values()))
+
+    return stages
+
+
+def execute_ordered(
+    tasks: Sequence[Callable[[], T]], keys: Sequence[Optional[Hashable]], max_workers: int = 1
+) -> list[T]:
+    """
+    Run tasks on a bounded thread pool while respecting ordering where it matters:
+    tasks which share a key run one after another in their original order, and tasks
+    without a key act as barriers, running only after everything before them has finished
+    and before anything after them has started.
+
+    Results are returned in the same order as the tasks. Tasks are expected to handle
+    their own errors; an unhandled exception stops its chain and is raised to the caller
+    """
+
+    if len(tasks) != len(keys):
+        raise ValueError("every task must have a key")
+
+    results: list[T] = [None] * len(tasks)  # type: ignore
+    if max_workers <= 1 or len(tasks) <= 1:
+        for i, task in enumerate(tasks):
+            results[i] = task()
+
+        return results
+
+    def run_chain(chain: list[int]) -> None:
+        for i in chain:
+            results[i] = tasks[i]()
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks))) as executor:
+        for stage in _plan_stages(keys):
+            futures = [executor.submit(run_chain, chain) for chain in stage]
+            for future in futures:
+                future.result()
+
+    return results
@@ -0,0 +1,127 @@
+import json
+from typing import Any, Callable, Optional, cast
+
+from ask_sdk_core.dispatch_components import AbstractRequestHandler
+from ask_sdk_core.handler_input import HandlerInput
+from ask_sdk_core.skill import SkillConfiguration
+from ask_sdk_core.skill_builder import CustomSkillBuilder
+from ask_sdk_model import IntentRequest, RequestEnvelope
+from ask_sdk_model.services.api_client import ApiClient
+from ask_sdk_runtime.dispatch_components import (
+    GenericRequestHandlerChain,
+    GenericRequestMapper,
+)
+
+HandlerKey = tuple[str, Optional[str]]
+"""(request type, intent name); the intent name is None for handlers of every request of a type"""
+
+
+class _IndexedRequestHandler(AbstractRequestHandler):
+    """Request handler which is only ever chosen by key, so it never needs to check the request itself"""
+
+    def __init__(self, handle_func: Callable[[HandlerInput], Any]) -> None:
+        self.handle_func = handle_func
+
+    def can_handle(self, handler_input: HandlerInput) -> bool:
+        return True
+
+    def handle(self, handler_input: HandlerInput) -> Any:
+        return self.handle_func(handler_input)
+
+
+def get_handler_key(handler_input: HandlerInput) -> HandlerKey:
+    request = handler_input.request_envelope.request
+    if not request or not request.object_type:
+        # no handler is registered under an empty request type, so only the predicate handlers are checked
+        return "", None
+
+    if isinstance(request, IntentRequest) and request.intent:
+        return request.object_type, request.intent.name
+
+    return request.object_type, None
+
+
+class IndexedRequestMapper(GenericRequestMapper):
+    """
+    Request mapper which looks up handlers by request type and intent name rather than asking each
+    handler whether it can handle the request. Requests without an indexed handler fall back to the
+    predicate handlers, which are checked in the order they were registered
+    """
+
+    def __init__(
+        self,
+        indexed_chains: dict[HandlerKey, GenericRequestHandlerChain],
+        request_handler_chains: list[GenericRequestHandlerChain],
+    ) -> None:
+        super().__init__(request_handler_chains)
+        self.indexed_chains = indexed_chains
+
+    def get_request_handler_chain(self, handler_input: Any) -> Optional[GenericRequestHandlerChain]:
+        (request_type, intent_name) = get_handler_key(handler_input)
+        chain = self.indexed_chains.get((request_type, intent_name))
+        if not chain and intent_name:
+            chain = self.indexed_chains.get((request_type, None))
+
+        return chain or super().get_request_handler_chain(handler_input)
+
+
+class IndexedSkillBuilder(CustomSkillBuilder):
+    """
+    Skill builder whose handlers can be registered by request type or intent name and found with a
+    single lookup. The skill is built once, when its Lambda handler is created, and reused by every
+    invocation in the container; handlers can't be registered after that
+    """
+
+    def __init__(self, api_client: ApiClient) -> None:
+        super().__init__(api_client=api_client)
+        self.indexed_chains: dict[HandlerKey, GenericRequestHandlerChain] = {}
+        self._built = False
+
+    def add_indexed_handler(self, key: HandlerKey, handle_func: Callable[[HandlerInput], Any]) -> None:
+        if self._built:
+            raise ValueError(f"unable to register a handler for {key}; the skill has already been built")
+
+        if key in self.indexed_chains:
+            raise ValueError(f"a handler is already registered for {key}")
+
+        self.indexed_chains[key] = GenericRequestHandlerChain(request_handler=_IndexedRequestHandler(handle_func))
+
+    def request_type_handler(self, *request_types: str) -> Callable:
+        """Decorator which registers a handler for every request of the given types"""
+
+        def wrapper(handle_func: Callable[[HandlerInput], Any]) -> Callable[[HandlerInput], Any]:
+            for request_type in request_types:
+                self.add_indexed_handler((request_type, None), handle_func)
+
+            return handle_func
+
+        return wrapper
+
+    def intent_handler(self, *intent_names: str) -> Callable:
+        """Decorator which registers a handler for intent requests with the given names"""
+
+        def wrapper(handle_func: Callable[[HandlerInput], Any]) -> Callable[[HandlerInput], Any]:
+            for intent_name in intent_names:
+                self.add_indexed_handler(("IntentRequest", intent_name), handle_func)
+
+            return handle_func
+
+        return wrapper
+
+    @property
+    def skill_configuration(self) -> SkillConfiguration:
+        config = super().skill_configuration
+        predicate_chains = [chain for mapper in config.request_mappers for chain in mapper.request_handler_chains]
+        config.request_mappers = [IndexedRequestMapper(self.indexed_chains, predicate_chains)]
+        return config
+
+    def lambda_handler(self) -> Callable[[Any, Any], dict[str, Any]]:
+        skill = self.create()
+        self._built = True
+
+        def wrapper(event: Any, context: Any) -> dict[str, Any]:
+            request_envelope = skill.serializer.deserialize(payload=json.dumps(event), obj_type=RequestEnvelope)
+            response_envelope = skill.invoke(request_envelope=request_envelope, context=context)
+            return cast(dict[str, Any], skill.serializer.serialize(response_envelope))
+
+        return wrapper
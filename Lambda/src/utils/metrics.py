@@ -0,0 +1,161 @@
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from functools import wraps
+from typing import Any, Callable, ContextManager, Optional, TypeVar, cast
+
+from ask_sdk_core.dispatch_components import (
+    AbstractRequestInterceptor,
+    AbstractResponseInterceptor,
+)
+from ask_sdk_core.handler_input import HandlerInput
+
+METRICS_ENABLED = os.getenv("metricsEnabled", "false").lower() == "true"
+"""when enabled, invocation timings are written to the logs in CloudWatch Embedded Metric Format"""
+METRICS_NAMESPACE = os.getenv("metricsNamespace", "UnifiedShoppingListHelper")
+
+DIMENSIONS = ["RequestType", "Operation"]
+MAX_VALUES_PER_METRIC = 100
+"""EMF only accepts this many values for a single metric in one log line"""
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class InvocationMetrics:
+    """Timings and counts collected over a single invocation, which may be recorded from several threads"""
+
+    def __init__(self, request_type: str) -> None:
+        self.start = time.perf_counter()
+        self.dimensions = {"RequestType": request_type, "Operation": "none"}
+        self.values: dict[str, list[float]] = {}
+        self.units: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, value: float, unit: str = "Milliseconds") -> None:
+        with self._lock:
+            values = self.values.setdefault(name, [])
+            if len(values) < MAX_VALUES_PER_METRIC:
+                values.append(value)
+
+            self.units[name] = unit
+
+    def to_emf(self, error: bool) -> dict[str, Any]:
+        """Build the EMF log event; each metric is reported as every value recorded for it"""
+
+        self.record("Invocation", (time.perf_counter() - self.start) * 1000)
+        self.record("Error", int(error), "Count")
+        with self._lock:
+            return {
+                "_aws": {
+                    "Timestamp": int(time.time() * 1000),
+                    "CloudWatchMetrics": [
+                        {
+                            "Namespace": METRICS_NAMESPACE,
+                            "Dimensions": [DIMENSIONS],
+                            "Metrics": [{"Name": name, "Unit": self.units[name]} for name in self.values],
+                        }
+                    ],
+                },
+                **self.dimensions,
+                **{name: values[0] if len(values) == 1 else values for name, values in self.values.items()},
+            }
+
+
+_current: Optional[InvocationMetrics] = None
+"""metrics for the invocation in progress; invocations never overlap within a container"""
+
+
+_noop_span: ContextManager[None] = nullcontext()
+"""shared by every span while metrics are disabled; nullcontext holds no state, so it can be reused"""
+
+
+class _Span:
+    def __init__(self, metrics: InvocationMetrics, name: str) -> None:
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *args: Any) -> None:
+        self.metrics.record(self.name, (time.perf_counter() - self.start) * 1000)
+
+
+def span(name: str) -> ContextManager[None]:
+    """Time a block of code; does nothing unless metrics are being collected"""
+
+    metrics = _current
+    return _Span(metrics, name) if metrics else _noop_span
+
+
+def record_timing(name: str, seconds: float) -> None:
+    """Record a duration that has already been measured"""
+
+    metrics = _current
+    if metrics:
+        metrics.record(name, seconds * 1000)
+
+
+def increment(name: str) -> None:
+    metrics = _current
+    if metrics:
+        metrics.record(name, 1, "Count")
+
+
+def set_operation(operation: str) -> None:
+    metrics = _current
+    if metrics:
+        metrics.dimensions["Operation"] = operation
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """Decorator which times every call to a function. If metrics are disabled the function is left as-is"""
+
+    def decorator(func: F) -> F:
+        if not METRICS_ENABLED:
+            return func
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            metrics = _current
+            if not metrics:
+                return func(*args, **kwargs)
+
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+
+            finally:
+                metrics.record(name, (time.perf_counter() - start) * 1000)
+
+        return cast(F, wrapper)
+
+    return decorator
+
+
+def start_invocation(request_type: str) -> None:
+    global _current
+    _current = InvocationMetrics(request_type)
+
+
+def end_invocation(error: bool = False) -> None:
+    """Write the invocation's metrics to the logs as a single EMF event"""
+
+    global _current
+    metrics = _current
+    _current = None
+    if metrics:
+        print(json.dumps(metrics.to_emf(error)))
+
+
+class MetricsRequestInterceptor(AbstractRequestInterceptor):
+    def process(self, handler_input: HandlerInput) -> None:
+        request = handler_input.request_envelope.request
+        start_invocation((request.object_type if request else None) or "unknown")
+
+
+class MetricsResponseInterceptor(AbstractResponseInterceptor):
+    def process(self, handler_input: HandlerInput, response: Any) -> None:
+        end_invocation()
@@ -0,0 +1,105 @@
+import json
+import logging
+import os
+import tracemalloc
+from typing import Any, Optional
+
+from ask_sdk_core.dispatch_components import (
+    AbstractRequestInterceptor,
+    AbstractResponseInterceptor,
+)
+from ask_sdk_core.handler_input import HandlerInput
+
+from .dispatch import get_handler_key
+
+MEMORY_PROFILING_ENABLED = os.getenv("memoryProfilingEnabled", "false").lower() == "true"
+"""when enabled, each invocation's peak memory and top allocation sites are written to the logs; this is slow"""
+MEMORY_PROFILING_TOP_SITES = int(os.getenv("memoryProfilingTopSites", "10"))
+
+if MEMORY_PROFILING_ENABLED:
+    # start tracing as early as possible so the cold start's imports are attributed too;
+    # set PYTHONTRACEMALLOC=1 as well to trace from interpreter start
+    tracemalloc.start()
+
+_IGNORED_FRAMES = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen *>")]
+
+
+class _InvocationProfile:
+    def __init__(self, handler: str, baseline: tracemalloc.Snapshot, cold: bool) -> None:
+        self.handler = handler
+        self.baseline = baseline
+        self.start_size = tracemalloc.get_traced_memory()[0]
+        self.cold = cold
+
+
+_current: Optional[_InvocationProfile] = None
+"""the profile of the invocation in progress; invocations never overlap within a container"""
+_warm = False
+
+
+def _format_site(traceback: tracemalloc.Traceback) -> str:
+    frame = traceback[0]
+    path = "/".join(frame.filename.split(os.sep)[-3:])
+    return f"{path}:{frame.lineno}"
+
+
+def _get_top_sites(statistics: list[Any], size_attribute: str) -> list[dict[str, Any]]:
+    return [
+        {"site": _format_site(stat.traceback), "kb": round(getattr(stat, size_attribute) / 1024, 1)}
+        for stat in statistics[:MEMORY_PROFILING_TOP_SITES]
+    ]
+
+
+def start_memory_profile(handler_input: HandlerInput) -> None:
+    global _current, _warm
+    if not tracemalloc.is_tracing():
+        return
+
+    request_type, intent_name = get_handler_key(handler_input)
+    handler = f"{request_type}:{intent_name}" if intent_name else str(request_type)
+
+    tracemalloc.reset_peak()
+    _current = _InvocationProfile(handler, tracemalloc.take_snapshot().filter_traces(_IGNORED_FRAMES), not _warm)
+    _warm = True
+
+
+def end_memory_profile(error: bool = False) -> None:
+    """
+    Log the invocation's peak allocation above what was already allocated when it started, along with the
+    sites which allocated the most memory that was still held when it finished. The first invocation also
+    logs the sites holding the most memory from the cold start, e.g. imports
+    """
+
+    global _current
+    profile = _current
+    _current = None
+    if not profile:
+        return
+
+    current_size, peak_size = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED_FRAMES)
+    # compare_to orders by absolute difference, but only sites which grew are of interest
+    growth = sorted(snapshot.compare_to(profile.baseline, "lineno"), key=lambda stat: stat.size_diff, reverse=True)
+    summary: dict[str, Any] = {
+        "handler": profile.handler,
+        "error": error,
+        "peak_kb": round((peak_size - profile.start_size) / 1024, 1),
+        "retained_kb": round((current_size - profile.start_size) / 1024, 1),
+        "top_sites": _get_top_sites(growth, "size_diff"),
+    }
+
+    if profile.cold:
+        summary["cold_start_kb"] = round(profile.start_size / 1024, 1)
+        summary["cold_start_sites"] = _get_top_sites(profile.baseline.statistics("lineno"), "size")
+
+    logging.info(f"memory profile {json.dumps(summary)}")
+
+
+class MemoryProfilingRequestInterceptor(AbstractRequestInterceptor):
+    def process(self, handler_input: HandlerInput) -> None:
+        start_memory_profile(handler_input)
+
+
+class MemoryProfilingResponseInterceptor(AbstractResponseInterceptor):
+    def process(self, handler_input: HandlerInput, response: Any) -> None:
+        end_memory_profile()
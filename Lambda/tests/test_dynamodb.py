@@ -0,0 +1,63 @@
+import unittest
+from decimal import Decimal
+from typing import Any, Iterator
+from unittest.mock import patch
+
+from src.interfaces import dynamodb
+from src.interfaces.dynamodb import DynamoDB
+
+
+class FakePaginator:
+    def __init__(self, items: list[dict[str, Any]]) -> None:
+        self.items = items
+
+    def paginate(self, **kwargs: Any) -> Iterator[dict[str, Any]]:
+        yield {"Items": self.items}
+
+
+class FakeDynamoDBClient:
+    def __init__(self) -> None:
+        self.items: dict[str, dict[str, Any]] = {}
+
+    def put_item(self, TableName: str, Item: dict[str, Any]) -> None:
+        self.items[Item["id"]["S"]] = Item
+
+    def get_item(self, TableName: str, Key: dict[str, Any]) -> dict[str, Any]:
+        item = self.items.get(Key["id"]["S"])
+        return {"Item": item} if item else {}
+
+    def batch_get_item(self, RequestItems: dict[str, Any]) -> dict[str, Any]:
+        ((tablename, request),) = RequestItems.items()
+        items = [self.items[key["id"]["S"]] for key in request["Keys"] if key["id"]["S"] in self.items]
+        return {"Responses": {tablename: items}}
+
+    def get_paginator(self, operation: str) -> FakePaginator:
+        return FakePaginator(list(self.items.values()))
+
+
+class DynamoDBRoundTripTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client = FakeDynamoDBClient()
+        patcher = patch.object(dynamodb, "get_aws_client", return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.db = DynamoDB("table")
+        self.item = {"id": "a", "price": Decimal("1.00000000000000000001"), "count": 3, "prices": [Decimal("0.1")]}
+        self.db.put(dict(self.item))
+
+    def test_get(self) -> None:
+        self.assertEqual(self.db.get("id", "a"), self.item)
+
+    def test_batch_get(self) -> None:
+        self.assertEqual(self.db.batch_get("id", ["a"]), [self.item])
+
+    def test_query(self) -> None:
+        self.assertEqual(list(self.db.query("id = :id")), [self.item])
+
+    def test_scan(self) -> None:
+        self.assertEqual(list(self.db.scan()), [self.item])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import random
+import string
+import unittest
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+from uuid import UUID
+
+from src.interfaces.dynamodb_codec import (
+    deserialize_item,
+    deserialize_value,
+    serialize_item,
+    serialize_value,
+)
+
+
+class Color(Enum):
+    red = "red"
+
+
+def random_value(rng: random.Random, depth: int = 0) -> Any:
+    choices = ["str", "int", "float", "bool", "none", "bytes"]
+    if depth < 3:
+        choices += ["map", "list", "str_set", "num_set"]
+
+    kind = rng.choice(choices)
+    if kind == "str":
+        return "".join(rng.choices(string.printable, k=rng.randint(0, 20)))
+
+    if kind == "int":
+        return rng.randint(-(10**20), 10**20)
+
+    if kind == "float":
+        return rng.uniform(-1e9, 1e9) * rng.choice([1, 1e-12, 1e12])
+
+    if kind == "bool":
+        return rng.choice([True, False])
+
+    if kind == "none":
+        return None
+
+    if kind == "bytes":
+        return bytes(rng.getrandbits(8) for _ in range(rng.randint(0, 20)))
+
+    if kind == "map":
+        return {f"k{i}": random_value(rng, depth + 1) for i in range(rng.randint(0, 5))}
+
+    if kind == "list":
+        return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 5))]
+
+    if kind == "str_set":
+        return {f"s{rng.randint(0, 100)}" for _ in range(rng.randint(1, 5))}
+
+    return {rng.randint(-1000, 1000) for _ in range(rng.randint(1, 5))}
+
+
+class SerializeValueTests(unittest.TestCase):
+    def test_scalars(self) -> None:
+        self.assertEqual(serialize_value("a"), {"S": "a"})
+        self.assertEqual(serialize_value(True), {"BOOL": True})
+        self.assertEqual(serialize_value(12), {"N": "12"})
+        self.assertEqual(serialize_value(0.1), {"N": "0.1"})
+        self.assertEqual(serialize_value(Decimal("1.50")), {"N": "1.50"})
+        self.assertEqual(serialize_value(None), {"NULL": True})
+        self.assertEqual(serialize_value(b"\x00"), {"B": b"\x00"})
+
+    def test_sets(self) -> None:
+        self.assertEqual(serialize_value({"a"}), {"SS": ["a"]})
+        self.assertEqual(serialize_value(frozenset([1])), {"NS": ["1"]})
+        self.assertEqual(serialize_value({b"a"}), {"BS": [b"a"]})
+
+    def test_empty_set_is_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            serialize_value(set())
+
+        with self.assertRaises(ValueError):
+            serialize_item({"values": frozenset()})
+
+    def test_mixed_set_is_rejected(self) -> None:
+        with self.assertRaises(TypeError):
+            serialize_value({"a", 1})
+
+    def test_non_finite_floats_are_rejected(self) -> None:
+        for value in [float("nan"), float("inf"), float("-inf")]:
+            with self.assertRaises(ValueError):
+                serialize_value(value)
+
+    def test_converted_types(self) -> None:
+        self.assertEqual(serialize_value(datetime(2023, 1, 2, 3, 4, 5, 6)), {"S": "2023-01-02T03:04:05.000006"})
+        self.assertEqual(serialize_value(UUID(int=1)), {"S": UUID(int=1).hex})
+        self.assertEqual(serialize_value(Color.red), {"S": "red"})
+        self.assertEqual(serialize_value((1, "a")), {"L": [{"N": "1"}, {"S": "a"}]})
+
+    def test_unsupported_type_is_rejected(self) -> None:
+        with self.assertRaises(TypeError):
+            serialize_value(object())
+
+
+class DeserializeValueTests(unittest.TestCase):
+    def test_numbers(self) -> None:
+        self.assertEqual(deserialize_value({"N": "12"}), 12)
+        self.assertIsInstance(deserialize_value({"N": "12"}), int)
+        self.assertEqual(deserialize_value({"N": "1.5"}), 1.5)
+        self.assertEqual(deserialize_value({"N": "1.50"}, use_decimal=True), Decimal("1.50"))
+
+    def test_unknown_type_is_rejected(self) -> None:
+        with self.assertRaises(TypeError):
+            deserialize_value({"X": "?"})
+
+
+class RoundTripTests(unittest.TestCase):
+    def test_random_items_round_trip(self) -> None:
+        rng = random.Random(0)
+        for _ in range(2000):
+            item = {"id": "item", "value": random_value(rng)}
+            self.assertEqual(deserialize_item(serialize_item(item)), item)
+
+    def test_sets_round_trip_as_sets(self) -> None:
+        item = {"strings": {"a", "b"}, "numbers": {1, 2.5}, "binary": {b"a"}}
+        self.assertEqual(deserialize_item(serialize_item(item)), item)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import importlib.util
+import os
+import subprocess
+import sys
+import unittest
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, "scripts", "import_budget.py")
+
+_spec = importlib.util.spec_from_file_location("import_budget", SCRIPT)
+assert _spec and _spec.loader
+import_budget = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(import_budget)
+
+
+class ImportBudgetTests(unittest.TestCase):
+    def test_cold_import_loads_few_modules(self) -> None:
+        """Importing the skill doesn't import deferred modules, and stays within the module budget"""
+
+        (_, modules) = import_budget.profile_import()
+        for module in import_budget.DEFERRED_MODULES:
+            self.assertNotIn(module, modules)
+
+        self.assertLessEqual(len(modules), import_budget.MAX_MODULES)
+
+    @unittest.skipUnless(
+        os.getenv("IMPORT_BUDGET_MS"), "wall-clock import time is only checked if IMPORT_BUDGET_MS is set"
+    )
+    def test_cold_import_is_within_budget(self) -> None:
+        """Importing the skill stays within the cold start budget"""
+
+        result = subprocess.run([sys.executable, SCRIPT, "--runs", "3"], capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+from unittest.mock import patch
+
+from ask_sdk_core.handler_input import HandlerInput
+from ask_sdk_model import Context, RequestEnvelope, User
+from ask_sdk_model.interfaces.system.system_state import SystemState
+from ask_sdk_model.services.list_management.list_item_body import ListItemBody
+from ask_sdk_model.services.list_management.list_items_created_event_request import (
+    ListItemsCreatedEventRequest,
+)
+
+from src.handlers import list_events
+from src.interfaces.dedup import ListEventDeduplicator
+from src.models.messages import Operation
+
+
+def build_input(request_id: str) -> HandlerInput:
+    request = ListItemsCreatedEventRequest(
+        request_id=request_id, body=ListItemBody(list_id="list", list_item_ids=["item"])
+    )
+    context = Context(system=SystemState(user=User(user_id="user", access_token="token")))
+    return HandlerInput(RequestEnvelope(request=request, context=context))
+
+
+class DuplicateListEventTests(unittest.TestCase):
+    def test_duplicates_are_counted(self) -> None:
+        deduplicator = ListEventDeduplicator(None, 60)
+        deduplicator.claim("event")
+
+        with patch.object(list_events, "list_event_deduplicator", deduplicator), patch.object(
+            list_events, "send_list_event"
+        ) as send_list_event, patch.object(list_events, "increment") as increment:
+            list_events.handle_list_item_event(build_input("event"), Operation.create)
+
+        send_list_event.assert_not_called()
+        increment.assert_called_once_with("ListEvent.duplicate")
+
+
+if __name__ == "__main__":
+    unittest.main()
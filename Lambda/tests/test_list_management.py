@@ -0,0 +1,37 @@
+import unittest
+
+from ask_sdk_model.services.list_management.error import Error
+from ask_sdk_model.services.service_exception import ServiceException
+
+from src.interfaces.list_management import ListManagement
+from src.models.lists import BulkDeleteListItems
+
+
+class FakeListManagementClient:
+    def delete_list_item(self, list_id: str, item_id: str) -> None:
+        if item_id == "missing":
+            raise ServiceException("not found", 404, [], Error(message="item not found"))
+
+        if item_id == "broken":
+            raise ConnectionError("connection reset")
+
+
+class BulkWriteTests(unittest.TestCase):
+    def test_failures_are_reported_per_item(self) -> None:
+        list_management = ListManagement(FakeListManagementClient())  # type: ignore[arg-type]
+        bulk_request = BulkDeleteListItems.parse_obj(
+            {"list_id": "list", "items": [{"item_id": "a"}, {"item_id": "missing"}, {"item_id": "broken"}]}
+        )
+
+        with self.assertLogs(level="ERROR"):
+            result = list_management.bulk_delete_list_items(bulk_request)
+
+        self.assertEqual(result.failed, 2)
+        self.assertEqual(
+            [(item.id, item.error) for item in result.results],
+            [("a", None), ("missing", "item not found"), ("broken", "ConnectionError: connection reset")],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
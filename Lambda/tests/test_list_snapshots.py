@@ -0,0 +1,60 @@
+import time
+import unittest
+from typing import Any, Optional
+from unittest.mock import patch
+
+from src.interfaces import list_snapshots
+from src.interfaces.list_snapshots import ListSnapshotStore
+
+
+class FakeDynamoDB:
+    def __init__(self) -> None:
+        self.items: dict[str, dict[str, Any]] = {}
+        self.puts = 0
+
+    def get(self, key: str, value: str) -> Optional[dict[str, Any]]:
+        item = self.items.get(value)
+        return dict(item) if item else None
+
+    def put(self, item: dict[str, Any], expiration: Optional[int] = None) -> bool:
+        self.puts += 1
+        self.items[item["snapshot_id"]] = {**item, "expires": int(time.time()) + (expiration or 0)}
+        return True
+
+
+class ListSnapshotStoreTests(unittest.TestCase):
+    def setUp(self) -> None:
+        with patch.object(list_snapshots, "DynamoDB", return_value=FakeDynamoDB()):
+            self.store = ListSnapshotStore("snapshots")
+
+        self.db: FakeDynamoDB = self.store.db  # type: ignore[assignment]
+        self.token = self.store.put("list", "active", {"a": 1})
+
+    def age_snapshot(self, seconds: int) -> None:
+        for item in self.db.items.values():
+            item["expires"] -= seconds
+
+    def test_refresh_extends_the_expiration(self) -> None:
+        self.age_snapshot(list_snapshots.SNAPSHOT_REFRESH_INTERVAL * 2)
+        self.assertEqual(self.store.get("list", "active", self.token, refresh=True), {"a": 1})
+        self.assertEqual(self.db.puts, 2)
+
+        (item,) = self.db.items.values()
+        self.assertGreaterEqual(item["expires"], time.time() + self.store.expiration - 1)
+
+    def test_refresh_is_rate_limited(self) -> None:
+        self.assertEqual(self.store.get("list", "active", self.token, refresh=True), {"a": 1})
+        self.assertEqual(self.db.puts, 1)
+
+    def test_reads_without_refresh_are_not_written(self) -> None:
+        self.age_snapshot(list_snapshots.SNAPSHOT_REFRESH_INTERVAL * 2)
+        self.assertEqual(self.store.get("list", "active", self.token), {"a": 1})
+        self.assertEqual(self.db.puts, 1)
+
+    def test_missing_snapshot(self) -> None:
+        self.assertIsNone(self.store.get("list", "active", "missing", refresh=True))
+        self.assertEqual(self.db.puts, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
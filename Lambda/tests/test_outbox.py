@@ -0,0 +1,106 @@
+import unittest
+from unittest.mock import patch
+
+from requests import RequestException
+
+from src.handlers import outbox as outbox_handler
+from src.models.dynamodb import OutboxEvent
+from src.models.shopping_list_api import ShoppingListAPIListEvent
+
+from .test_shopping_list_api import build_event
+
+
+def build_outbox_event(list_event: ShoppingListAPIListEvent, user: str = "user") -> OutboxEvent:
+    return OutboxEvent(
+        request_id=list_event.request_id,
+        auth_token_hash=user,
+        auth_token_encrypted=user.encode(),
+        list_event=list_event.json(),
+    )
+
+
+class FakeOutbox:
+    def __init__(self, pending: list[OutboxEvent]) -> None:
+        self.pending = pending
+        self.done: list[str] = []
+        self.attempted: list[str] = []
+
+    def get_pending(self) -> list[OutboxEvent]:
+        return self.pending
+
+    def get_auth_token(self, outbox_event: OutboxEvent) -> str:
+        if outbox_event.auth_token_hash == "poison":
+            raise ValueError("unable to decrypt token")
+
+        return outbox_event.auth_token_hash
+
+    def mark_done(self, outbox_events: list[OutboxEvent]) -> None:
+        self.done.extend(outbox_event.request_id for outbox_event in outbox_events)
+
+    def mark_attempted(self, outbox_event: OutboxEvent) -> None:
+        self.attempted.append(outbox_event.request_id)
+
+
+class FakeShoppingListAPIClient:
+    def __init__(self, failing_request_ids: set[str]) -> None:
+        self.failing_request_ids = failing_request_ids
+        self.posted: list[list[str]] = []
+
+    def post_list_item_events(self, list_events: list[ShoppingListAPIListEvent]) -> None:
+        if any(list_event.request_id in self.failing_request_ids for list_event in list_events):
+            raise RequestException("bad gateway")
+
+        self.posted.append([list_event.request_id for list_event in list_events])
+
+
+class DeliverBatchTests(unittest.TestCase):
+    def test_only_failed_events_are_attempted(self) -> None:
+        list_events = [build_event("a", 0), build_event("b", 1, "delete"), build_event("c", 2)]
+        outbox = FakeOutbox([build_outbox_event(list_event) for list_event in list_events])
+        client = FakeShoppingListAPIClient({"b"})
+
+        with patch.object(outbox_handler, "USL_POST_ITEM_EVENTS_BATCH_ROUTE", None):
+            result = outbox_handler._deliver_batch(outbox, client, outbox.pending)
+
+        self.assertEqual(result, (2, 1))
+        self.assertEqual(client.posted, [["a"], ["c"]])
+        self.assertEqual(outbox.done, ["a", "c"])
+        self.assertEqual(outbox.attempted, ["b"])
+
+    def test_coalesced_events_share_their_outcome(self) -> None:
+        list_events = [build_event("a", 0), build_event("b", 1), build_event("c", 2, "delete")]
+        outbox = FakeOutbox([build_outbox_event(list_event) for list_event in list_events])
+        client = FakeShoppingListAPIClient({"a"})
+
+        with patch.object(outbox_handler, "USL_POST_ITEM_EVENTS_BATCH_ROUTE", None):
+            result = outbox_handler._deliver_batch(outbox, client, outbox.pending)
+
+        self.assertEqual(result, (1, 2))
+        self.assertEqual(outbox.done, ["c"])
+        self.assertEqual(outbox.attempted, ["a", "b"])
+
+
+class DrainOutboxTests(unittest.TestCase):
+    def test_a_failing_user_does_not_block_others(self) -> None:
+        pending = [
+            build_outbox_event(build_event("a", 0), "poison"),
+            build_outbox_event(build_event("b", 1), "poison"),
+            build_outbox_event(build_event("c", 2), "user"),
+        ]
+        outbox = FakeOutbox(pending)
+        client = FakeShoppingListAPIClient(set())
+
+        with patch.object(outbox_handler, "LIST_EVENT_OUTBOX_TABLENAME", "outbox"), patch.object(
+            outbox_handler, "ListEventOutbox", return_value=outbox
+        ), patch.object(outbox_handler, "ShoppingListAPIInterface", return_value=client), self.assertLogs(
+            level="ERROR"
+        ):
+            result = outbox_handler.drain_outbox()
+
+        self.assertEqual(result, {"delivered": 1, "failed": 2})
+        self.assertEqual(outbox.done, ["c"])
+        self.assertEqual(outbox.attempted, ["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
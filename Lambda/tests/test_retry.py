@@ -0,0 +1,102 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import Optional
+
+from requests import ConnectionError, HTTPError, Response, Timeout
+
+from src.clients.retry import RetryPolicy, RetryStats, parse_retry_after
+
+
+def build_response(status_code: int = 503, retry_after: Optional[str] = None) -> Response:
+    response = Response()
+    response.status_code = status_code
+    if retry_after is not None:
+        response.headers["Retry-After"] = retry_after
+
+    return response
+
+
+class ParseRetryAfterTests(unittest.TestCase):
+    def test_missing_header(self) -> None:
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after(build_response()))
+        self.assertIsNone(parse_retry_after(build_response(retry_after="")))
+
+    def test_seconds(self) -> None:
+        self.assertEqual(parse_retry_after(build_response(retry_after="3")), 3)
+        self.assertEqual(parse_retry_after(build_response(retry_after="1.5")), 1.5)
+        self.assertEqual(parse_retry_after(build_response(retry_after="-2")), 0)
+
+    def test_http_date(self) -> None:
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+        delay = parse_retry_after(build_response(retry_after=format_datetime(retry_at, usegmt=True)))
+        assert delay is not None
+        self.assertGreater(delay, 25)
+        self.assertLessEqual(delay, 30)
+
+    def test_past_http_date(self) -> None:
+        retry_at = datetime.now(timezone.utc) - timedelta(minutes=5)
+        self.assertEqual(parse_retry_after(build_response(retry_after=format_datetime(retry_at, usegmt=True))), 0)
+
+    def test_invalid_value(self) -> None:
+        self.assertIsNone(parse_retry_after(build_response(retry_after="soon")))
+
+
+class RetryPolicyTests(unittest.TestCase):
+    def test_backoff_without_jitter(self) -> None:
+        policy = RetryPolicy(backoff_base=0.5, backoff_max=3, jitter=False)
+        self.assertEqual([policy.get_delay(attempt) for attempt in range(1, 6)], [0.5, 1, 2, 3, 3])
+
+    def test_jitter_stays_within_the_backoff(self) -> None:
+        policy = RetryPolicy(backoff_base=0.5, backoff_max=3)
+        for attempt in range(1, 6):
+            limit = min(3, 0.5 * 2 ** (attempt - 1))
+            for _ in range(100):
+                delay = policy.get_delay(attempt)
+                self.assertGreaterEqual(delay, 0)
+                self.assertLessEqual(delay, limit)
+
+    def test_retry_after_overrides_the_backoff(self) -> None:
+        policy = RetryPolicy(backoff_max=3)
+        self.assertEqual(policy.get_delay(1, build_response(retry_after="7")), 7)
+
+    def test_should_retry(self) -> None:
+        policy = RetryPolicy(max_attempts=3)
+        self.assertTrue(policy.should_retry(1, ConnectionError()))
+        self.assertTrue(policy.should_retry(2, Timeout()))
+        self.assertFalse(policy.should_retry(3, Timeout()))
+        self.assertTrue(policy.should_retry(1, HTTPError(response=build_response(503))))
+        self.assertFalse(policy.should_retry(1, HTTPError(response=build_response(400))))
+        self.assertFalse(policy.should_retry(1, HTTPError()))
+
+
+class RetryStatsTests(unittest.TestCase):
+    def test_counters(self) -> None:
+        stats = RetryStats()
+        stats.record_attempt(0.2)
+        stats.record_retry(0.5)
+        stats.record_attempt(0.1)
+        stats.record_request()
+        stats.record_attempt(0.3)
+        stats.record_request(failed=True, deadline_exceeded=True)
+
+        snapshot = stats.snapshot()
+        self.assertEqual(
+            {key: snapshot[key] for key in ["requests", "attempts", "retries", "failures", "deadline_exceeded"]},
+            {"requests": 2, "attempts": 3, "retries": 1, "failures": 1, "deadline_exceeded": 1},
+        )
+        self.assertAlmostEqual(snapshot["latency_total"], 0.6)
+        self.assertEqual(snapshot["latency_max"], 0.3)
+        self.assertEqual(snapshot["wait_total"], 0.5)
+
+    def test_reset(self) -> None:
+        stats = RetryStats()
+        stats.record_attempt(0.2)
+        stats.record_request(failed=True)
+        stats.reset()
+        self.assertTrue(all(value == 0 for value in stats.snapshot().values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from src.interfaces.shopping_list_api import coalesce_list_events
+from src.models.shopping_list_api import ShoppingListAPIListEvent
+
+START = datetime(2023, 1, 1, 12)
+
+
+def build_event(
+    request_id: str, seconds: float, operation: str = "create", timestamp: Optional[datetime] = None
+) -> ShoppingListAPIListEvent:
+    return ShoppingListAPIListEvent(
+        request_id=request_id,
+        timestamp=timestamp or START + timedelta(seconds=seconds),
+        operation=operation,
+        object_type="list_item",
+        list_id="list",
+        list_item_ids=[request_id],
+    )
+
+
+class CoalesceListEventsTests(unittest.TestCase):
+    def test_merges_events_with_the_same_operation(self) -> None:
+        coalesced = coalesce_list_events([build_event("a", 0), build_event("b", 1), build_event("c", 2)], 5)
+        self.assertEqual([event.list_item_ids for event in coalesced], [["a", "b", "c"]])
+        self.assertEqual(coalesced[0].request_id, "a")
+        self.assertEqual(coalesced[0].timestamp, START + timedelta(seconds=2))
+
+    def test_keeps_operations_in_order(self) -> None:
+        events = [build_event("a", 0), build_event("b", 1, "delete"), build_event("c", 2)]
+        coalesced = coalesce_list_events(events, 5)
+        self.assertEqual(
+            [(event.operation, event.list_item_ids) for event in coalesced],
+            [
+                ("create", ["a"]),
+                ("delete", ["b"]),
+                ("create", ["c"]),
+            ],
+        )
+
+    def test_window_is_measured_from_the_first_event(self) -> None:
+        coalesced = coalesce_list_events([build_event(str(i), i * 2) for i in range(6)], 5)
+        self.assertEqual([event.list_item_ids for event in coalesced], [["0", "1", "2"], ["3", "4", "5"]])
+
+    def test_mixed_naive_and_aware_timestamps(self) -> None:
+        aware = START.replace(tzinfo=timezone.utc) + timedelta(seconds=1)
+        eastern = datetime(2023, 1, 1, 7, 0, 3, tzinfo=timezone(timedelta(hours=-5)))
+        events = [build_event("c", 0, timestamp=eastern), build_event("a", 0), build_event("b", 0, timestamp=aware)]
+
+        coalesced = coalesce_list_events(events, 5)
+        self.assertEqual([event.list_item_ids for event in coalesced], [["a", "b", "c"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
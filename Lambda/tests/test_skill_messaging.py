@@ -0,0 +1,88 @@
+import unittest
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+from ask_sdk_core.handler_input import HandlerInput
+from ask_sdk_model import Context, RequestEnvelope, User
+from ask_sdk_model.interfaces.messaging.message_received_request import (
+    MessageReceivedRequest,
+)
+from ask_sdk_model.interfaces.system.system_state import SystemState
+
+from src.handlers import skill_messaging
+from src.handlers.skill_messaging import _get_message_operation, _get_request_key
+from src.models.messages import ReceivedMessage
+from src.utils import metrics
+
+
+def build_message(*operations: Any) -> ReceivedMessage:
+    return ReceivedMessage(
+        source="test",
+        event_id="event",
+        requests=[{"operation": operation, "object_type": "list"} for operation in operations],
+    )
+
+
+class GetRequestKeyTests(unittest.TestCase):
+    def test_list_scoped_requests_are_keyed_by_list(self) -> None:
+        self.assertEqual(_get_request_key({"operation": "read", "object_data": {"list_id": "a"}}), "a")
+        self.assertEqual(_get_request_key({"operation": "read", "object_data": {"listId": "a"}}), "a")
+
+    def test_unscoped_requests_have_no_key(self) -> None:
+        self.assertIsNone(_get_request_key({"operation": "read_all", "object_data": {"list_id": "a"}}))
+        self.assertIsNone(_get_request_key({"operation": "create", "object_data": {"name": "a"}}))
+        self.assertIsNone(_get_request_key({"operation": "read", "object_data": None}))
+
+    def test_non_string_list_ids_have_no_key(self) -> None:
+        for list_id in [["a"], {"a": 1}, 1]:
+            self.assertIsNone(_get_request_key({"operation": "read", "object_data": {"list_id": list_id}}))
+
+
+class GetMessageOperationTests(unittest.TestCase):
+    def test_shared_operation(self) -> None:
+        self.assertEqual(_get_message_operation(build_message("read", "read")), "read")
+        self.assertEqual(_get_message_operation(build_message("read", "update")), "mixed")
+
+    def test_invalid_operations(self) -> None:
+        self.assertEqual(_get_message_operation(build_message(["read"], {"a": 1}, None)), "invalid")
+        self.assertEqual(_get_message_operation(build_message("read", ["read"], {"a": 1})), "mixed")
+
+
+class FakeListManagement:
+    def read_all_lists(self) -> Any:
+        return MagicMock(to_dict=lambda: {"lists": []})
+
+
+class RouteMessageTests(unittest.TestCase):
+    def test_mixed_valid_and_invalid_requests_with_metrics(self) -> None:
+        message = {
+            "source": "test",
+            "event_id": "event",
+            "requests": [{"operation": "read_all", "object_type": "list"}, {"operation": ["read"], "object_type": {}}],
+        }
+        input = HandlerInput(
+            RequestEnvelope(
+                request=MessageReceivedRequest(message=message),
+                context=Context(system=SystemState(user=User(user_id="user"))),
+            ),
+            service_client_factory=MagicMock(),
+        )
+
+        invocation_metrics = metrics.InvocationMetrics("Messaging.MessageReceived")
+        with patch.object(metrics, "_current", invocation_metrics), patch.object(
+            skill_messaging, "METRICS_ENABLED", True
+        ), patch.object(skill_messaging, "get_list_management", return_value=FakeListManagement()), self.assertLogs(
+            level="INFO"
+        ):
+            response = skill_messaging.route_message(input)
+
+        self.assertEqual(invocation_metrics.dimensions["Operation"], "mixed")
+
+        body = response.api_response["body"]
+        self.assertFalse(body["success"])
+        self.assertTrue(body["detail"].startswith("1 of 2 requests failed"))
+        self.assertEqual(body["data"][0], {"lists": [], "metadata": None})
+
+
+if __name__ == "__main__":
+    unittest.main()
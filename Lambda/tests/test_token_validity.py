@@ -0,0 +1,63 @@
+import unittest
+from unittest.mock import patch
+
+from requests import HTTPError, Response
+
+from src.interfaces.token_validity import TokenValidityCache, is_auth_failure
+
+
+def build_error(status_code: int) -> HTTPError:
+    response = Response()
+    response.status_code = status_code
+    return HTTPError(response=response)
+
+
+class TokenValidityCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.now = 1000.0
+        patcher = patch("src.utils.cache.time.monotonic", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.cache = TokenValidityCache(valid_ttl=60, invalid_ttl=600)
+
+    def test_tokens_are_keyed_by_hash(self) -> None:
+        self.cache.set("token", True)
+        self.assertEqual(list(self.cache.cache._entries), [TokenValidityCache.get_key("token")])
+        self.assertNotIn("token", self.cache.cache._entries)
+
+    def test_rejections_are_remembered_longer(self) -> None:
+        self.cache.set("valid", True)
+        self.cache.set("invalid", False)
+
+        self.now += 120
+        self.assertIsNone(self.cache.get("valid"))
+        self.assertIs(self.cache.get("invalid"), False)
+
+        self.now += 600
+        self.assertIsNone(self.cache.get("invalid"))
+
+    def test_invalidate_user_forgets_their_last_token(self) -> None:
+        self.cache.track_user("user", "old")
+        self.cache.set("old", False)
+        self.cache.track_user("user", "new")
+        self.cache.set("new", False)
+
+        self.cache.invalidate_user("user")
+        self.assertIsNone(self.cache.get("new"))
+        self.assertIs(self.cache.get("old"), False)
+
+        # the user's token is no longer tracked, so this does nothing
+        self.cache.set("new", False)
+        self.cache.invalidate_user("user")
+        self.assertIs(self.cache.get("new"), False)
+
+    def test_only_auth_failures_are_rejections(self) -> None:
+        self.assertTrue(is_auth_failure(build_error(401)))
+        self.assertTrue(is_auth_failure(build_error(403)))
+        self.assertFalse(is_auth_failure(build_error(500)))
+        self.assertFalse(is_auth_failure(HTTPError()))
+
+
+if __name__ == "__main__":
+    unittest.main()
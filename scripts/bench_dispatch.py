@@ -0,0 +1,150 @@
+"""
+Benchmarks request dispatch through the indexed skill builder against the stock skill builder,
+which asks each handler's can_handle predicate in turn and rebuilds the skill on every invocation.
+
+Usage: python scripts/bench_dispatch.py [envelopes] [iterations]
+
+Both skills register the same handlers in the same order, with handlers that return an
+empty response, over a mixed stream of envelopes weighted towards list events and messages
+"""
+
+import json
+import os
+import random
+import sys
+import timeit
+from typing import Any
+
+from ask_sdk_core.api_client import DefaultApiClient
+from ask_sdk_core.handler_input import HandlerInput
+from ask_sdk_core.skill_builder import CustomSkillBuilder
+from ask_sdk_core.utils import is_intent_name, is_request_type
+from ask_sdk_model import RequestEnvelope
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Lambda"))
+
+from src.utils.dispatch import IndexedSkillBuilder  # noqa: E402
+
+REQUEST_TYPES = [
+    "AlexaSkillEvent.SkillAccountLinked",
+    "AlexaSkillEvent.SkillDisabled",
+    "LaunchRequest",
+]
+
+INTENT_NAMES = ["AddToShoppingList", "AMAZON.HelpIntent", "AMAZON.CancelIntent", "AMAZON.StopIntent"]
+
+LIST_ITEM_EVENT_TYPES = [
+    "AlexaHouseholdListEvent.ItemsCreated",
+    "AlexaHouseholdListEvent.ItemsUpdated",
+    "AlexaHouseholdListEvent.ItemsDeleted",
+]
+
+
+def respond(input: HandlerInput, *args: Any, **kwargs: Any) -> Any:
+    return input.response_builder.response
+
+
+def build_predicate_skill() -> CustomSkillBuilder:
+    """The handlers as they were registered before, each with a can_handle predicate"""
+
+    sb = CustomSkillBuilder()
+    for request_type in REQUEST_TYPES:
+        sb.request_handler(is_request_type(request_type))(respond)
+
+    sb.request_handler(is_intent_name("AddToShoppingList"))(respond)
+    sb.request_handler(is_intent_name("AMAZON.HelpIntent"))(respond)
+    sb.request_handler(
+        lambda input: any([is_intent_name("AMAZON.CancelIntent")(input), is_intent_name("AMAZON.StopIntent")(input)])
+    )(respond)
+
+    def is_list_item_event(input: HandlerInput) -> bool:
+        return any([is_request_type(request_type)(input) for request_type in LIST_ITEM_EVENT_TYPES])
+
+    def handle_list_item_event(input: HandlerInput) -> Any:
+        # the handler then had to work out which operation the event was
+        for request_type in LIST_ITEM_EVENT_TYPES:
+            if is_request_type(request_type)(input):
+                return respond(input)
+
+    sb.request_handler(is_list_item_event)(handle_list_item_event)
+    sb.request_handler(is_request_type("Messaging.MessageReceived"))(respond)
+    return sb
+
+
+def build_indexed_skill() -> IndexedSkillBuilder:
+    sb = IndexedSkillBuilder(api_client=DefaultApiClient())
+    sb.request_type_handler(*REQUEST_TYPES)(respond)
+    sb.intent_handler(*INTENT_NAMES)(respond)
+    for i, request_type in enumerate(LIST_ITEM_EVENT_TYPES):
+        sb.add_indexed_handler((request_type, None), lambda input, operation=i: respond(input, operation))
+
+    sb.request_type_handler("Messaging.MessageReceived")(respond)
+    return sb
+
+
+def build_event(request_type: str, intent_name: str = "") -> dict[str, Any]:
+    request: dict[str, Any] = {"type": request_type, "requestId": "request-id", "timestamp": "2023-01-01T00:00:00Z"}
+    if intent_name:
+        request["intent"] = {"name": intent_name}
+
+    if request_type in LIST_ITEM_EVENT_TYPES:
+        request["body"] = {"listId": "list-id", "listItemIds": ["item-id"]}
+
+    if request_type == "Messaging.MessageReceived":
+        request["message"] = {"source": "USL", "event_id": "event-id", "requests": []}
+
+    return {
+        "version": "1.0",
+        "context": {"System": {"application": {"applicationId": "skill-id"}, "user": {"userId": "user-id"}}},
+        "request": request,
+    }
+
+
+def build_stream(count: int) -> list[dict[str, Any]]:
+    weighted = (
+        [(request_type, "") for request_type in LIST_ITEM_EVENT_TYPES] * 6
+        + [("Messaging.MessageReceived", "")] * 6
+        + [(request_type, "") for request_type in REQUEST_TYPES]
+        + [("IntentRequest", intent_name) for intent_name in INTENT_NAMES]
+    )
+
+    return [build_event(*random.choice(weighted)) for _ in range(count)]
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    events = build_stream(count)
+    predicate_sb = build_predicate_skill()
+    indexed_sb = build_indexed_skill()
+
+    # handler lookup alone
+    predicate_mapper = predicate_sb.skill_configuration.request_mappers[0]
+    indexed_mapper = indexed_sb.skill_configuration.request_mappers[0]
+    serializer = predicate_sb.create().serializer
+    inputs = [
+        HandlerInput(request_envelope=serializer.deserialize(json.dumps(event), RequestEnvelope)) for event in events
+    ]
+
+    for input in inputs:
+        assert predicate_mapper.get_request_handler_chain(input) and indexed_mapper.get_request_handler_chain(input)
+
+    # the stock builder's handler builds the skill on every invocation; the indexed builder's builds it here
+    predicate_handler = predicate_sb.lambda_handler()
+    indexed_handler = indexed_sb.lambda_handler()
+    timings = {
+        "lookup (predicates)": lambda: [predicate_mapper.get_request_handler_chain(input) for input in inputs],
+        "lookup (indexed)": lambda: [indexed_mapper.get_request_handler_chain(input) for input in inputs],
+        "invocation (stock builder)": lambda: [predicate_handler(event, None) for event in events],
+        "invocation (indexed builder)": lambda: [indexed_handler(event, None) for event in events],
+    }
+
+    print(f"{count} envelopes, best of {iterations} runs")
+    for label, func in timings.items():
+        seconds = min(timeit.repeat(func, number=1, repeat=iterations))
+        print(f"  {label:<30} {seconds / count * 1e6:8.1f}us per envelope")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmarks the native DynamoDB codec against the dynamodb_json round trip it replaced.
+Round trips are checked by the codec's tests in Lambda/tests.
+
+Usage: python scripts/bench_dynamodb_codec.py [iterations]
+"""
+
+import json
+import os
+import random
+import sys
+import timeit
+from typing import Any
+
+from dynamodb_json import json_util as ddb_json  # type: ignore
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Lambda"))
+
+from src.interfaces.dynamodb_codec import (  # noqa: E402
+    deserialize_item,
+    serialize_item,
+)
+
+
+def build_callback_item() -> dict[str, Any]:
+    """A realistic callback event: a read_list response for a 100 item list"""
+
+    items = [
+        {
+            "id": f"{i:08x}-0000-0000-0000-000000000000",
+            "version": random.randint(1, 20),
+            "value": f"item {i}",
+            "status": "active",
+            "createdTime": "Mon Jan 02 15:04:05 UTC 2023",
+            "updatedTime": "Mon Jan 02 15:04:05 UTC 2023",
+            "href": f"/v2/householdlists/list-id/items/{i}",
+        }
+        for i in range(100)
+    ]
+
+    body = {"success": True, "data": [{"listId": "list-id", "name": "Alexa shopping list", "items": items}]}
+    return {"event_source": "USL", "event_id": "event-id", "data": json.dumps(body), "expires": 1700000000}
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    item = build_callback_item()
+    nested = {**item, "data": json.loads(item["data"])}
+    for label, value in [("callback event", item), ("nested response", nested)]:
+        serialized = serialize_item(value)
+        timings = {
+            "dynamodb_json dumps": timeit.timeit(lambda: ddb_json.dumps(value, as_dict=True), number=iterations),
+            "native serialize": timeit.timeit(lambda: serialize_item(value), number=iterations),
+            "dynamodb_json loads": timeit.timeit(lambda: ddb_json.loads(serialized), number=iterations),
+            "native deserialize": timeit.timeit(lambda: deserialize_item(serialized), number=iterations),
+        }
+
+        print(f"\n{label} ({iterations} iterations)")
+        for name, seconds in timings.items():
+            print(f"  {name:<22} {seconds / iterations * 1e6:9.1f}us")
+
+
+if __name__ == "__main__":
+    main()
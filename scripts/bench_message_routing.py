@@ -0,0 +1,149 @@
+"""
+Benchmarks routing a large multi-request message through the route table, which validates
+each request as it's processed, against the original approach of validating the whole
+message up front and walking an if/elif tree for each request.
+
+Usage: python scripts/bench_message_routing.py [requests] [iterations]
+
+Alexa is replaced with a stand-in which returns immediately, so only the routing and
+validation overhead is measured
+"""
+
+import os
+import random
+import sys
+import timeit
+from typing import Any
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Lambda"))
+
+from src.handlers.skill_messaging import _process_request  # noqa: E402
+from src.models.lists import (  # noqa: E402
+    CreateList,
+    CreateListItem,
+    DeleteList,
+    DeleteListItem,
+    ReadList,
+    ReadListItem,
+    UpdateList,
+    UpdateListItem,
+)
+from src.models.messages import (  # noqa: E402
+    Message,
+    MessageRequest,
+    ObjectType,
+    Operation,
+    ReceivedMessage,
+)
+
+
+class StandInResponse:
+    def to_dict(self) -> dict[str, Any]:
+        return {"id": "object-id"}
+
+
+class StandInListManagement:
+    """Accepts any ListManagement call and returns a response"""
+
+    def __getattr__(self, name: str) -> Any:
+        return lambda *args: StandInResponse()
+
+
+def legacy_process_request(list_management: Any, msg_request: MessageRequest) -> Any:
+    response: Any = None
+    if msg_request.operation == Operation.read_all:
+        if msg_request.object_type == ObjectType.list:
+            response = list_management.read_all_lists()
+
+    elif msg_request.operation == Operation.read:
+        if msg_request.object_type == ObjectType.list:
+            response = list_management.read_list(ReadList.parse_obj(msg_request.object_data))
+
+        elif msg_request.object_type == ObjectType.list_item:
+            response = list_management.read_list_item(ReadListItem.parse_obj(msg_request.object_data))
+
+    else:
+        if msg_request.object_type == ObjectType.list:
+            if msg_request.operation == Operation.create:
+                response = list_management.create_list(CreateList.parse_obj(msg_request.object_data))
+
+            elif msg_request.operation == Operation.update:
+                response = list_management.update_list(UpdateList.parse_obj(msg_request.object_data))
+
+            elif msg_request.operation == Operation.delete:
+                response = list_management.delete_list(DeleteList.parse_obj(msg_request.object_data))
+
+        elif msg_request.object_type == ObjectType.list_item:
+            if msg_request.operation == Operation.create:
+                response = list_management.create_list_item(CreateListItem.parse_obj(msg_request.object_data))
+
+            elif msg_request.operation == Operation.update:
+                response = list_management.update_list_item(UpdateListItem.parse_obj(msg_request.object_data))
+
+            elif msg_request.operation == Operation.delete:
+                response = list_management.delete_list_item(DeleteListItem.parse_obj(msg_request.object_data))
+
+    response_data = response.to_dict()
+    response_data["metadata"] = msg_request.metadata
+    return response, response_data
+
+
+def build_message(count: int) -> dict[str, Any]:
+    """A message with a realistic mix of requests, weighted towards list item changes"""
+
+    item = {"listId": "list-id", "itemId": "item-id"}
+    templates = [
+        ("read_all", "list", None),
+        ("read", "list", {"listId": "list-id", "state": "active"}),
+        ("update", "list", {"listId": "list-id", "name": "Groceries", "version": 1}),
+        ("read", "list_item", item),
+        ("create", "list_item", {"listId": "list-id", "value": "milk"}),
+        ("create", "list_item", {"listId": "list-id", "value": "eggs"}),
+        ("update", "list_item", {**item, "value": "bread", "status": "completed", "version": 2}),
+        ("update", "list_item", {**item, "value": "butter", "version": 4}),
+        ("delete", "list_item", item),
+    ]
+
+    requests = []
+    for i in range(count):
+        (operation, object_type, object_data) = random.choice(templates)
+        requests.append(
+            {
+                "operation": operation,
+                "object_type": object_type,
+                "object_data": object_data,
+                "metadata": {"request": i},
+            }
+        )
+
+    return {"source": "USL", "event_id": "event-id", "requests": requests, "send_callback_response": True}
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    list_management: Any = StandInListManagement()
+    message_data = build_message(count)
+
+    def legacy() -> list:
+        msg = Message.parse_obj(message_data)
+        return [legacy_process_request(list_management, msg_request) for msg_request in msg.requests]
+
+    def routed() -> list:
+        msg = ReceivedMessage.parse_obj(message_data)
+        return [_process_request(list_management, raw_request) for raw_request in msg.requests]
+
+    assert [data for _, data in legacy()] == [data for _, data in routed()]
+
+    legacy_seconds = min(timeit.repeat(legacy, number=iterations, repeat=5)) / iterations
+    routed_seconds = min(timeit.repeat(routed, number=iterations, repeat=5)) / iterations
+
+    print(f"{count} requests per message, {iterations} iterations")
+    print(f"  if/elif tree  {legacy_seconds * 1e3:8.3f}ms  ({legacy_seconds / count * 1e6:6.1f}us per request)")
+    print(f"  route table   {routed_seconds * 1e3:8.3f}ms  ({routed_seconds / count * 1e6:6.1f}us per request)")
+    print(f"  speedup       {legacy_seconds / routed_seconds:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
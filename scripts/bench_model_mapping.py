@@ -0,0 +1,112 @@
+"""
+Benchmarks AlexaBase cast/map_to/merge using cached field plans against the original
+implementations, which compared every field on each call and always re-validated in `cast`.
+
+Usage: python scripts/bench_model_mapping.py [iterations]
+"""
+
+import os
+import sys
+import timeit
+from typing import Any, Callable
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Lambda"))
+
+from src.models._base import AlexaBase  # noqa: E402
+from src.models.lists import (  # noqa: E402
+    CreateListItem,
+    DeleteListItem,
+    ReadListItem,
+    UpdateList,
+    UpdateListItem,
+)
+from src.models.shopping_list_api import ShoppingListAPIListItem  # noqa: E402
+
+
+def legacy_cast(self: AlexaBase, cls: type, **kwargs) -> Any:
+    create_data = {field: getattr(self, field) for field in self.__fields__ if field in cls.__fields__}
+    create_data.update(kwargs or {})
+    return cls(**create_data)
+
+
+def legacy_map_to(self: AlexaBase, dest: Any) -> Any:
+    for field in self.__fields__:
+        if field in dest.__fields__:
+            setattr(dest, field, getattr(self, field))
+
+    return dest
+
+
+def legacy_merge(self: AlexaBase, src: Any, replace_null=False) -> None:
+    for field in src.__fields__:
+        val = getattr(src, field)
+        if field in self.__fields__ and (val is not None or replace_null):
+            setattr(self, field, val)
+
+
+def best_of(func: Callable[[], Any], iterations: int, repeat: int = 5) -> float:
+    """Fastest of several runs, which is the least affected by noise"""
+
+    return min(timeit.repeat(func, number=iterations, repeat=repeat)) / iterations
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    update_item = UpdateListItem(list_id="list-id", item_id="item-id", value="milk", version=3)
+    api_item = ShoppingListAPIListItem(id="item-id", value="milk")
+    create_item = CreateListItem(list_id="list-id", value="eggs")
+    update_list = UpdateList(list_id="list-id", name="Groceries", version=1)
+
+    # the fast path must produce the same models as the validated path
+    for src, cls, kwargs in [
+        (update_item, CreateListItem, {}),
+        (update_item, DeleteListItem, {}),
+        (update_item, ReadListItem, {}),
+        (api_item, UpdateListItem, {"list_id": "list-id", "item_id": "item-id", "version": 3}),
+    ]:
+        fast = src.cast(cls, **kwargs)
+        slow = legacy_cast(src, cls, **kwargs)
+        assert fast == slow and fast.__fields_set__ == slow.__fields_set__, (fast, slow)
+
+    cases: list[tuple[str, Callable[[], Any], Callable[[], Any]]] = [
+        (
+            "cast item (trusted)",
+            lambda: legacy_cast(update_item, CreateListItem),
+            lambda: update_item.cast(CreateListItem),
+        ),
+        (
+            "cast item (validated)",
+            lambda: legacy_cast(api_item, UpdateListItem, list_id="list-id", item_id="item-id", version=3),
+            lambda: api_item.cast(UpdateListItem, list_id="list-id", item_id="item-id", version=3),
+        ),
+        (
+            "cast list to read",
+            lambda: legacy_cast(update_list, ReadListItem, item_id="item-id"),
+            lambda: update_list.cast(ReadListItem, item_id="item-id"),
+        ),
+        (
+            "map_to item",
+            lambda: legacy_map_to(update_item, create_item),
+            lambda: update_item.map_to(create_item),
+        ),
+        (
+            "merge item",
+            lambda: legacy_merge(create_item, update_item),
+            lambda: create_item.merge(update_item),
+        ),
+    ]
+
+    print(f"{iterations} iterations")
+    print(f"  {'':<24} {'original':>10} {'planned':>10} {'speedup':>8}")
+    for label, legacy, planned in cases:
+        legacy_seconds = best_of(legacy, iterations)
+        planned_seconds = best_of(planned, iterations)
+        print(
+            f"  {label:<24} {legacy_seconds * 1e6:8.2f}us {planned_seconds * 1e6:8.2f}us"
+            f" {legacy_seconds / planned_seconds:7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
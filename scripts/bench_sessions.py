@@ -0,0 +1,72 @@
+"""
+Compares a fresh session per request (the old behavior) with the pooled session registry
+against a local keep-alive HTTP server standing in for the Unified Shopping List API.
+
+Usage: python scripts/bench_sessions.py [requests]
+
+This only measures TCP connection setup; against the real API each new connection also
+pays for a TLS handshake, so the real-world difference is larger
+"""
+
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Lambda"))
+
+from src.clients.sessions import close_sessions, get_session  # noqa: E402
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("content-length", 0)))
+        self.send_response(200)
+        self.send_header("content-length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def run(label: str, session_factory, url: str, count: int) -> float:
+    timings: list[float] = []
+    for _ in range(count):
+        start = time.perf_counter()
+        session_factory().post(url, json={"requestId": "bench"}, headers={"Authorization": "Bearer token"})
+        timings.append(time.perf_counter() - start)
+
+    timings.sort()
+    p50 = timings[len(timings) // 2] * 1000
+    p99 = timings[int(len(timings) * 0.99) - 1] * 1000
+    print(f"{label:<16} p50 {p50:7.3f}ms  p99 {p99:7.3f}ms  total {sum(timings):.3f}s")
+    return p50
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}/"
+    url = base_url + "events"
+
+    try:
+        fresh = run("fresh session", requests.session, url, count)
+        pooled = run("pooled session", lambda: get_session(base_url), url, count)
+        print(f"speedup (p50)    {fresh / pooled:.2f}x")
+
+    finally:
+        close_sessions()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
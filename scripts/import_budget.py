@@ -0,0 +1,99 @@
+"""
+Profiles a cold import of the skill and fails if it goes over budget, so regressions
+in Lambda cold start time are caught before they're deployed.
+
+Usage: python scripts/import_budget.py [--max-ms 400] [--max-modules 750] [--runs 5] [--top 20]
+
+Each run imports the skill in a fresh interpreter with `-X importtime`. The median run is
+reported along with the modules which took the longest to import (including their own imports).
+The budget may also be set with the IMPORT_BUDGET_MS and IMPORT_BUDGET_MODULES env vars.
+The skill's tests (Lambda/tests/test_import_budget.py) check the loaded modules on every run,
+and the import time only when IMPORT_BUDGET_MS is set, since wall-clock time varies between machines
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+LAMBDA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Lambda")
+ENTRY_MODULE = "src.skill"
+
+MAX_MS = float(os.getenv("IMPORT_BUDGET_MS", "400"))
+MAX_MODULES = int(os.getenv("IMPORT_BUDGET_MODULES", "750"))
+
+DEFERRED_MODULES = ["boto3", "botocore"]
+"""modules which are expensive to import and must only be imported when they're first used"""
+
+
+def profile_import() -> tuple[dict[str, int], list[str]]:
+    """Import the skill in a fresh interpreter, returning the cumulative import time of each module and all loaded modules"""
+
+    script = f"import sys, {ENTRY_MODULE}; print('\\n'.join(sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        cwd=LAMBDA_DIR,
+        capture_output=True,
+        text=True,
+    )
+
+    if result.returncode:
+        raise RuntimeError(f"unable to import {ENTRY_MODULE}:\n{result.stderr}")
+
+    timings: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        (_, cumulative, module) = line.split("|")
+        name = module.strip()
+
+        # submodules are reported before their parents, and a parent package may be reported
+        # nested under its own submodule's import; the largest entry is the outermost import
+        timings[name] = max(timings.get(name, 0), int(cumulative))
+
+    return timings, result.stdout.split()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-ms", type=float, default=MAX_MS)
+    parser.add_argument("--max-modules", type=int, default=MAX_MODULES)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    runs = [profile_import() for _ in range(args.runs)]
+    runs.sort(key=lambda run: run[0][ENTRY_MODULE])
+    (timings, modules) = runs[len(runs) // 2]
+
+    total_ms = timings[ENTRY_MODULE] / 1000
+    print(f"import {ENTRY_MODULE}: median of {args.runs} runs")
+    print(f"  {'cumulative':>12}  module")
+    for name, micros in sorted(timings.items(), key=lambda timing: timing[1], reverse=True)[: args.top]:
+        print(f"  {micros / 1000:10.1f}ms  {name}")
+
+    print(f"\ntotal: {total_ms:.1f}ms (budget {args.max_ms:.0f}ms)")
+    print(f"modules loaded: {len(modules)} (budget {args.max_modules})")
+    print(f"all runs: {', '.join(f'{run[0][ENTRY_MODULE] / 1000:.0f}ms' for run in runs)}")
+
+    failures: list[str] = []
+    if total_ms > args.max_ms:
+        failures.append(f"import took {total_ms:.1f}ms, over the {args.max_ms:.0f}ms budget")
+
+    if len(modules) > args.max_modules:
+        failures.append(f"{len(modules)} modules were loaded, over the {args.max_modules} module budget")
+
+    for module in DEFERRED_MODULES:
+        if module in modules:
+            failures.append(f"{module} was imported eagerly; import it when it's first used instead")
+
+    if failures:
+        print("\n" + "\n".join(f"FAIL: {failure}" for failure in failures))
+        sys.exit(1)
+
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,456 @@
+"""
+Drives a stream of Alexa envelopes through `src.skill.handler` at a target concurrency and
+reports latency percentiles, throughput, USL retries, and peak memory, entirely offline.
+
+Usage: python scripts/load_test.py [--requests 2000] [--concurrency 8] [--users 50]
+                                   [--usl-latency-ms 20] [--usl-429-rate 0] [--usl-500-rate 0]
+                                   [--alexa-latency-ms 5] [--list-size 200] [--trace-memory]
+
+The skill runs against local stand-ins:
+- the Alexa API is answered in-process from an in-memory store of lists, after `--alexa-latency-ms`
+- the Unified Shopping List API is a local HTTP server, which waits `--usl-latency-ms` and fails
+  the given fraction of requests with a 429 (with a Retry-After header) or a 500
+- DynamoDB is held in memory, unless `dynamoDBEndpointUrl` points at a local DynamoDB whose tables
+  already exist
+
+Concurrent invocations share one container's module state (caches, sessions, circuit breakers),
+so the results describe a single warm container handling overlapping events. Other skill settings
+(e.g. `messageConcurrency`, `listCacheTTL`) are read from the environment as usual
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Optional
+from urllib.parse import urlparse
+
+from ask_sdk_model.services import ApiClient, ApiClientRequest, ApiClientResponse
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Lambda"))
+
+LIST_ITEM_EVENT_TYPES = [
+    "AlexaHouseholdListEvent.ItemsCreated",
+    "AlexaHouseholdListEvent.ItemsUpdated",
+    "AlexaHouseholdListEvent.ItemsDeleted",
+]
+
+ERROR_SPEECH = "didn't quite catch it"
+"""the skill's exception handler responds with this, so failed invocations can be spotted in responses"""
+
+
+class StandInUSL(ThreadingHTTPServer):
+    """Local stand-in for the Unified Shopping List API which accepts every request, after a delay"""
+
+    daemon_threads = True
+
+    def __init__(self, latency: float, throttle_rate: float, error_rate: float) -> None:
+        super().__init__(("127.0.0.1", 0), StandInUSLRequestHandler)
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+
+        self.counts = {"requests": 0, "throttled": 0, "errors": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def count(self, counter: str) -> None:
+        with self._lock:
+            self.counts[counter] += 1
+
+
+class StandInUSLRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: StandInUSL
+
+    def handle_request(self) -> None:
+        self.rfile.read(int(self.headers.get("content-length") or 0))
+        self.server.count("requests")
+        time.sleep(random.uniform(0.5, 1.5) * self.server.latency)
+
+        roll = random.random()
+        if roll < self.server.throttle_rate:
+            self.server.count("throttled")
+            self.send_response(429)
+            self.send_header("Retry-After", "0.05")
+
+        elif roll < self.server.throttle_rate + self.server.error_rate:
+            self.server.count("errors")
+            self.send_response(500)
+
+        else:
+            self.send_response(200)
+
+        self.send_header("content-length", "0")
+        self.end_headers()
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = handle_request
+
+    def log_message(self, *args: Any) -> None:
+        return None
+
+
+class StandInAlexaApiClient(ApiClient):
+    """
+    Answers the List Management API requests the skill makes from an in-memory store of lists,
+    in place of the API client the skill sends to api.amazonalexa.com
+    """
+
+    def __init__(self, latency: float, list_ids: list[str], list_size: int) -> None:
+        self.latency = latency
+        self.lists: dict[str, dict[str, dict[str, Any]]] = {
+            list_id: {f"{list_id}-item-{i}": self._build_item(f"{list_id}-item-{i}") for i in range(list_size)}
+            for list_id in list_ids
+        }
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _build_item(item_id: str, value: Optional[str] = None, version: int = 1) -> dict[str, Any]:
+        now = datetime.now(timezone.utc).isoformat()
+        return {
+            "id": item_id,
+            "version": version,
+            "value": value or f"item {item_id}",
+            "status": "active",
+            "createdTime": now,
+            "updatedTime": now,
+        }
+
+    def _route(self, method: str, parts: list[str], body: Any) -> tuple[int, Any]:
+        if not parts:
+            if method == "GET":
+                lists = [
+                    {"listId": list_id, "name": list_id, "state": "active", "version": 1} for list_id in self.lists
+                ]
+                return 200, {"lists": lists}
+
+            return 201, {"listId": str(uuid.uuid4()), "name": (body or {}).get("name"), "state": "active"}
+
+        items = self.lists.get(parts[0])
+        if items is None:
+            return 404, {"type": "NOT_FOUND", "message": f"list {parts[0]} does not exist"}
+
+        if len(parts) == 1:
+            return 200, {"listId": parts[0], "name": parts[0], "state": "active", "version": 1}
+
+        if parts[1] != "items":
+            return 200, {"listId": parts[0], "name": parts[0], "state": parts[1], "items": list(items.values())}
+
+        if method == "POST":
+            item = self._build_item(str(uuid.uuid4()), (body or {}).get("value"))
+            items[item["id"]] = item
+            return 201, item
+
+        item_id = parts[2]
+        if item_id not in items:
+            return 404, {"type": "NOT_FOUND", "message": f"item {item_id} does not exist"}
+
+        if method == "DELETE":
+            del items[item_id]
+            return 200, None
+
+        if method == "PUT":
+            item = self._build_item(item_id, (body or {}).get("value"), items[item_id]["version"] + 1)
+            items[item_id] = item
+
+        return 200, items[item_id]
+
+    def invoke(self, request: ApiClientRequest) -> ApiClientResponse:
+        time.sleep(random.uniform(0.5, 1.5) * self.latency)
+
+        path = urlparse(request.url).path
+        parts = [part for part in path.split("/") if part][2:]  # strip /v2/householdlists
+        body = json.loads(request.body) if isinstance(request.body, str) else request.body
+        with self._lock:
+            status_code, response_body = self._route(str(request.method), parts, body)
+
+        return ApiClientResponse(
+            headers=[("Content-type", "application/json")],
+            status_code=status_code,
+            body=json.dumps(response_body) if response_body is not None else "",
+        )
+
+
+class InMemoryDynamoDB:
+    """Just enough of the DynamoDB client for the skill's tables, held in memory"""
+
+    KEY_ATTRIBUTES = ["event_id", "request_id", "snapshot_id"]
+
+    class exceptions:
+        class ConditionalCheckFailedException(Exception):
+            pass
+
+    def __init__(self) -> None:
+        self.tables: dict[str, dict[str, dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def _get_key(self, item: dict[str, Any]) -> str:
+        for key in self.KEY_ATTRIBUTES:
+            if key in item:
+                return next(iter(item[key].values()))
+
+        raise ValueError(f"item has no known key attribute: {list(item)}")
+
+    def get_item(self, TableName: str, Key: dict[str, Any], **kwargs: Any) -> dict[str, Any]:
+        with self._lock:
+            item = self.tables.get(TableName, {}).get(self._get_key(Key))
+
+        return {"Item": item} if item else {}
+
+    def put_item(
+        self, TableName: str, Item: dict[str, Any], ConditionExpression: Optional[str] = None, **kwargs: Any
+    ) -> dict[str, Any]:
+        key = self._get_key(Item)
+        with self._lock:
+            table = self.tables.setdefault(TableName, {})
+            # the skill only uses conditions to create items which don't already exist
+            if ConditionExpression and key in table:
+                raise self.exceptions.ConditionalCheckFailedException()
+
+            table[key] = Item
+
+        return {}
+
+    def delete_item(self, TableName: str, Key: dict[str, Any], **kwargs: Any) -> dict[str, Any]:
+        with self._lock:
+            self.tables.get(TableName, {}).pop(self._get_key(Key), None)
+
+        return {}
+
+    def batch_write_item(self, RequestItems: dict[str, list[dict[str, Any]]]) -> dict[str, Any]:
+        for tablename, requests in RequestItems.items():
+            for request in requests:
+                if "PutRequest" in request:
+                    self.put_item(tablename, request["PutRequest"]["Item"])
+
+                else:
+                    self.delete_item(tablename, request["DeleteRequest"]["Key"])
+
+        return {"UnprocessedItems": {}}
+
+    def batch_get_item(self, RequestItems: dict[str, dict[str, Any]]) -> dict[str, Any]:
+        responses: dict[str, list[dict[str, Any]]] = {}
+        for tablename, request in RequestItems.items():
+            items = [self.get_item(tablename, key).get("Item") for key in request["Keys"]]
+            responses[tablename] = [item for item in items if item]
+
+        return {"Responses": responses, "UnprocessedKeys": {}}
+
+
+class StandInContext:
+    """Lambda context whose invocations time out after `timeout` seconds"""
+
+    def __init__(self, timeout: float) -> None:
+        self.deadline = time.monotonic() + timeout
+
+    def get_remaining_time_in_millis(self) -> int:
+        return int((self.deadline - time.monotonic()) * 1000)
+
+
+def build_envelope(user: int, request: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "version": "1.0",
+        "context": {
+            "System": {
+                "application": {"applicationId": "skill-id"},
+                "user": {"userId": f"user-{user}", "accessToken": f"usl-token-{user}"},
+                "apiEndpoint": "https://api.amazonalexa.com",
+                "apiAccessToken": f"alexa-token-{user}",
+            }
+        },
+        "request": {
+            "requestId": str(uuid.uuid4()),
+            "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            **request,
+        },
+    }
+
+
+def build_list_item_event(list_ids: list[str], list_size: int) -> tuple[str, dict[str, Any]]:
+    request_type = random.choice(LIST_ITEM_EVENT_TYPES)
+    list_id = random.choice(list_ids)
+    item_ids = [f"{list_id}-item-{random.randrange(list_size)}" for _ in range(random.randint(1, 3))]
+    return request_type.split(".")[-1], {"type": request_type, "body": {"listId": list_id, "listItemIds": item_ids}}
+
+
+def build_message(list_ids: list[str], list_size: int) -> tuple[str, dict[str, Any]]:
+    list_id = random.choice(list_ids)
+    requests: list[dict[str, Any]]
+    label, requests = random.choice(
+        [
+            ("read", [{"operation": "read", "object_type": "list", "object_data": {"listId": list_id}}]),
+            ("read_all", [{"operation": "read_all", "object_type": "list"}]),
+            (
+                "create",
+                [
+                    {"operation": "create", "object_type": "list_item", "object_data": {"listId": id, "value": "new"}}
+                    for id in random.sample(list_ids, min(3, len(list_ids)))
+                ],
+            ),
+            (
+                "update",
+                [
+                    {
+                        "operation": "update",
+                        "object_type": "list_item",
+                        "object_data": {
+                            "listId": list_id,
+                            "itemId": f"{list_id}-item-{random.randrange(list_size)}",
+                            "value": "updated",
+                            "status": "active",
+                            "version": 1,
+                        },
+                    }
+                ],
+            ),
+            (
+                "bulk_create",
+                [
+                    {
+                        "operation": "bulk_create",
+                        "object_type": "list_item",
+                        "object_data": {"listId": list_id, "items": [{"value": f"bulk {i}"} for i in range(20)]},
+                    }
+                ],
+            ),
+        ]
+    )
+
+    message = {"source": "USL", "event_id": str(uuid.uuid4()), "send_callback_response": True, "requests": requests}
+    return f"Message.{label}", {"type": "Messaging.MessageReceived", "message": message}
+
+
+def build_account_event() -> tuple[str, dict[str, Any]]:
+    request_type = random.choice(["AlexaSkillEvent.SkillAccountLinked", "AlexaSkillEvent.SkillDisabled"])
+    return request_type.split(".")[-1], {"type": request_type, "body": {}}
+
+
+def build_workload(count: int, users: int, list_ids: list[str], list_size: int) -> list[tuple[str, dict[str, Any]]]:
+    """Envelopes weighted towards list events and messages, as they are in production"""
+
+    builders: list[Callable[[], tuple[str, dict[str, Any]]]] = [
+        lambda: build_list_item_event(list_ids, list_size),
+        lambda: build_message(list_ids, list_size),
+        build_account_event,
+    ]
+
+    workload: list[tuple[str, dict[str, Any]]] = []
+    for _ in range(count):
+        label, request = random.choices(builders, weights=[60, 35, 5])[0]()
+        workload.append((label, build_envelope(random.randrange(users), request)))
+
+    return workload
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0
+
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--lists", type=int, default=4)
+    parser.add_argument("--list-size", type=int, default=200)
+    parser.add_argument("--alexa-latency-ms", type=float, default=5)
+    parser.add_argument("--usl-latency-ms", type=float, default=20)
+    parser.add_argument("--usl-429-rate", type=float, default=0)
+    parser.add_argument("--usl-500-rate", type=float, default=0)
+    parser.add_argument("--timeout", type=float, default=60, help="seconds before each invocation would time out")
+    parser.add_argument("--trace-memory", action="store_true", help="measure peak Python heap with tracemalloc")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    usl = StandInUSL(args.usl_latency_ms / 1000, args.usl_429_rate, args.usl_500_rate)
+    threading.Thread(target=usl.serve_forever, daemon=True).start()
+
+    # the skill reads its settings when it's imported
+    os.environ["apiBaseUrl"] = usl.base_url
+    from src import skill
+    from src.clients.retry import retry_stats
+
+    logging.getLogger().setLevel(logging.WARNING)
+    if not os.getenv("dynamoDBEndpointUrl"):
+        skill._aws_clients["dynamodb"] = InMemoryDynamoDB()
+
+    list_ids = [f"list-{i}" for i in range(args.lists)]
+    # `src.skill.handler` was built with the real API client, so build the same skill again with the stand-in
+    skill.sb.api_client = StandInAlexaApiClient(args.alexa_latency_ms / 1000, list_ids, args.list_size)
+    handler = skill.sb.lambda_handler()
+    workload = build_workload(args.requests, args.users, list_ids, args.list_size)
+
+    # warm the container so one-off setup isn't counted against the first invocations
+    handler(build_envelope(0, {"type": "LaunchRequest"}), StandInContext(args.timeout))
+    retry_stats.reset()
+
+    latencies: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    lock = threading.Lock()
+
+    def invoke(label: str, envelope: dict[str, Any]) -> None:
+        start = time.perf_counter()
+        response = handler(envelope, StandInContext(args.timeout))
+        latency = (time.perf_counter() - start) * 1000
+
+        with lock:
+            latencies.setdefault(label, []).append(latency)
+            if ERROR_SPEECH in json.dumps(response):
+                errors[label] = errors.get(label, 0) + 1
+
+    if args.trace_memory:
+        tracemalloc.start()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        for future in [executor.submit(invoke, label, envelope) for label, envelope in workload]:
+            future.result()
+
+    elapsed = time.perf_counter() - start
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024**2 if sys.platform == "darwin" else 1024)
+    peak_heap = tracemalloc.get_traced_memory()[1] / 1024**2 if args.trace_memory else None
+
+    all_latencies = [latency for values in latencies.values() for latency in values]
+    print(f"{len(all_latencies)} invocations at concurrency {args.concurrency} in {elapsed:.2f}s")
+    print(f"  throughput   {len(all_latencies) / elapsed:8.1f} invocations/s")
+    print(f"  {'':<28} {'count':>6} {'errors':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for label, values in sorted(latencies.items()) + [("all", all_latencies)]:
+        error_count = errors.get(label, 0) if label != "all" else sum(errors.values())
+        print(
+            f"  {label:<28} {len(values):>6} {error_count:>6} "
+            + " ".join(f"{percentile(values, pct):8.1f}" for pct in (50, 95, 99))
+        )
+
+    usl_stats = retry_stats.snapshot()
+    print(
+        f"  USL: {usl.counts['requests']} requests received, {usl.counts['throttled']} throttled, "
+        + f"{usl.counts['errors']} failed; client retries {usl_stats['retries']}, failures {usl_stats['failures']}"
+    )
+
+    print(f"  peak RSS     {peak_rss:8.1f} MB")
+    if peak_heap is not None:
+        print(f"  peak heap    {peak_heap:8.1f} MB (tracemalloc)")
+
+
+if __name__ == "__main__":
+    main()